@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Queued Debug Log Writer
+Shared by the CPython search scripts (search_daemon.py, search_vector_db.py):
+lines are queued by the caller and appended to the debug log shared with the
+interop client by a background thread, so logging never blocks on file I/O.
+Python 3 only.
+"""
+
+import os
+import io
+import atexit
+import queue
+import threading
+from datetime import datetime
+
+_LOG_PATH = None   # resolved (and its directory created) on first write
+_LOG_QUEUE = queue.Queue()
+_log_writer_started = False
+_log_writer_lock = threading.Lock()
+_log_write_lock = threading.Lock()   # held while a batch is being written
+
+
+def _write_log_lines(lines):
+    global _LOG_PATH
+    try:
+        if _LOG_PATH is None:
+            log_dir = os.path.join(os.environ.get('APPDATA', ''), 'BBB', 'StandardsAssistant')
+            os.makedirs(log_dir, exist_ok=True)
+            _LOG_PATH = os.path.join(log_dir, 'debug_log.txt')
+        with io.open(_LOG_PATH, 'a', encoding='utf-8') as f:
+            f.write(u"".join(lines))
+    except Exception:
+        pass
+
+
+def _drain_log_queue(lines):
+    """Move everything currently queued into *lines*."""
+    try:
+        while True:
+            lines.append(_LOG_QUEUE.get_nowait())
+    except queue.Empty:
+        pass
+    return lines
+
+
+def _log_writer():
+    # Block for one line, then take whatever else has queued up meanwhile
+    # and append the batch with a single open/write
+    while True:
+        first = _LOG_QUEUE.get()
+        with _log_write_lock:
+            _write_log_lines(_drain_log_queue([first]))
+
+
+def _flush_log():
+    """Write lines still queued at interpreter exit."""
+    # Waits for a batch the writer thread is in the middle of
+    with _log_write_lock:
+        lines = _drain_log_queue([])
+        if lines:
+            _write_log_lines(lines)
+
+
+def _start_log_writer():
+    global _log_writer_started
+    with _log_writer_lock:
+        if _log_writer_started:
+            return
+        t = threading.Thread(target=_log_writer)
+        t.daemon = True
+        t.start()
+        atexit.register(_flush_log)
+        _log_writer_started = True
+
+
+def queue_log(tag, message):
+    """Queue a timestamped ``[tag] message`` line for the shared debug log."""
+    try:
+        _LOG_QUEUE.put(u"{} [{}] {}\n".format(datetime.now().isoformat(), tag, message))
+        if not _log_writer_started:
+            _start_log_writer()
+    except Exception:
+        pass
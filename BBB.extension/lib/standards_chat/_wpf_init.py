@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""
+WPF Assembly References
+Imported by every WPF window module so the clr.AddReference calls run once
+per session instead of once per module.  Also holds small WPF helpers shared
+by those windows.
+"""
+
+import clr
+clr.AddReference('PresentationFramework')
+clr.AddReference('PresentationCore')
+clr.AddReference('WindowsBase')
+clr.AddReference('System.Xaml')
+
+from System.Windows.Media import SolidColorBrush, Color
+
+WPF_READY = True
+
+
+def frozen_brush(r, g, b):
+    """Create a frozen (immutable, thread-shareable) solid colour brush"""
+    brush = SolidColorBrush(Color.FromRgb(r, g, b))
+    brush.Freeze()
+    return brush
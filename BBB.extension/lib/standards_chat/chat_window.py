@@ -6,10 +6,8 @@ Manages the WPF window, user interactions, and coordinates API calls
 
 import clr
 import random
-clr.AddReference('PresentationFramework')
-clr.AddReference('PresentationCore')
-clr.AddReference('WindowsBase')
-clr.AddReference('System.Xaml')
+import itertools
+from standards_chat._wpf_init import frozen_brush  # also adds the WPF assembly references
 
 from System.Windows import Window
 from System.Windows.Markup import XamlReader
@@ -21,13 +19,20 @@ from System.Windows.Media.Imaging import BitmapImage
 from System.Windows.Media.Animation import DoubleAnimation, RepeatBehavior
 from System.Windows import Thickness, TextWrapping, HorizontalAlignment, Duration
 from System.Threading import Thread, ThreadStart
-from System.Windows.Threading import Dispatcher, DispatcherTimer
+from System.Windows.Threading import Dispatcher, DispatcherTimer, DispatcherPriority
 from System import TimeSpan, Uri
 import System
+import io
 import os
+import re
 import sys
 import time
 import json
+import threading
+import collections
+import traceback
+import webbrowser
+from datetime import datetime
 
 # Add lib path
 script_dir = os.path.dirname(__file__)
@@ -39,17 +44,52 @@ from pyrevit import forms
 from standards_chat.notion_client import NotionClient
 from standards_chat.anthropic_client import AnthropicClient
 from standards_chat.config_manager import ConfigManager
-from standards_chat.utils import extract_revit_context, safe_print, safe_str
+from standards_chat.utils import extract_revit_context, safe_print, safe_str, ascii_safe, safe_str_ascii
 from standards_chat.usage_logger import UsageLogger
 from standards_chat.revit_actions import RevitActionExecutor, parse_action_from_response
 from standards_chat.history_manager import HistoryManager
 
+# Inline markdown tokens, compiled once at import. Alternatives are tried in
+# order at each position: [text](url) links, [n] citations, raw URLs.  **bold**
+# is applied only to the plain text between them, so a bold span never hides
+# a link or citation inside it.
+_INLINE_MD_RE = re.compile(
+    u'(?P<link>\\[(?P<link_text>[^\\]]+)\\]\\((?P<link_url>[^)]+)\\))'
+    u'|(?P<cite>\\[(?P<cite_num>\\d+)\\])'
+    u'|(?P<url>https?://[^\\s]+)'
+)
+_NUMBERED_ITEM_RE = re.compile(u'^(\\d+\\.\\s)(.*)')
+
+# Any inline or line-level markdown; text without a match can skip Inlines
+_ANY_MD_RE = re.compile(
+    u'\\*\\*|\\[|https?://|^\\s*(?:#|[-*] |\\d+\\.\\s)', re.MULTILINE
+)
+
+# Set True to print per-line formatting errors from _add_formatted_text
+_DEBUG_FORMAT = False
+
+# Static brushes and margins shared by every DCT ticket panel
+_DIVIDER_BRUSH = frozen_brush(0xE0, 0xE0, 0xE0)
+_DCT_MESSAGE_BRUSH = frozen_brush(0x60, 0x60, 0x60)
+_DCT_DIVIDER_MARGIN = Thickness(0, 12, 0, 10)
+_DCT_MESSAGE_MARGIN = Thickness(0, 0, 0, 8)
+
+# Rotating playful messages shown above the DCT ticket button
+_DCT_MESSAGES = (
+    u"Hmm, I'm stumped. Maybe it's time to ask the humans!",
+    u"This one's beyond me -- the DCT team will know!",
+    u"I've hit my limit. The real experts can help from here.",
+    u"Not in my notes! Let's get a human on this one.",
+    u"Time to phone a friend? DCT's got your back.",
+    u"Even I have my blind spots. The team can help!",
+    u"I wish I knew! DCT will have the answer though.",
+)
+
+
 # Logger that writes to file only (no console output)
 def debug_log(message):
     """Write debug message to log file"""
     try:
-        import io
-        from datetime import datetime
         log_dir = os.path.join(os.environ.get('APPDATA', ''), 'BBB', 'StandardsAssistant')
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
@@ -63,6 +103,15 @@ def debug_log(message):
 class StandardsChatWindow(forms.WPFWindow):
     """Main chat window for Kodama"""
     
+    # DCT ticket button resources, built on first use and shared by every
+    # ticket panel (the template is sealed and the brushes frozen)
+    _dct_template = None
+    _dct_normal_bg = None
+    _dct_hover_bg = None
+    
+    # Detached top-level Runs recycled across streaming re-renders
+    _run_pool = collections.deque(maxlen=256)
+    
     def __init__(self):
         """Initialize the chat window"""
         # Load XAML via pyrevit forms (registers window with pyRevit's manager,
@@ -73,6 +122,14 @@ class StandardsChatWindow(forms.WPFWindow):
         )
         forms.WPFWindow.__init__(self, xaml_path)
         
+        # Streaming/typing state, set up front so hot paths can test for None
+        # instead of paying for hasattr()
+        self.streaming_border = None
+        self.streaming_textblock = None
+        self.streaming_content_stack = None
+        self.streaming_text = u""
+        self.typing_status_text = None
+        
         # Get UI elements from the XAML content tree
         self.messages_panel = self.FindName('MessagesPanel')
         self.input_textbox = self.FindName('InputTextBox')
@@ -159,6 +216,11 @@ class StandardsChatWindow(forms.WPFWindow):
             "Running in circles (efficiently)..."
         ]
         self.current_message_index = 0
+        # Shuffle once and cycle so each tick avoids an RNG call and never
+        # shows the same message twice in a row
+        self._loading_cycle = itertools.cycle(
+            random.sample(self.loading_messages, len(self.loading_messages))
+        )
         
         # Initialize clients
         try:
@@ -242,7 +304,6 @@ class StandardsChatWindow(forms.WPFWindow):
             
         except Exception as e:
             # Show error in status - use ASCII-safe conversion
-            from standards_chat.utils import safe_str_ascii
             self.status_text.Text = "Configuration Error: {}".format(safe_str_ascii(e))
             self.send_button.IsEnabled = False
             return
@@ -263,6 +324,13 @@ class StandardsChatWindow(forms.WPFWindow):
         self._cancel_requested = False
         self._bg_thread = None
 
+        # Streamed chunks waiting to be rendered. The background thread only
+        # queues text; one Background-priority dispatcher callback renders
+        # everything queued so far, so input and layout run between batches.
+        self._pending_chunks = []
+        self._chunk_flush_scheduled = False
+        self._chunk_lock = threading.Lock()
+
         # Suppress DB update prompt for the rest of the session once the user
         # has responded to it (either synced or deferred).
         self._db_update_dismissed = False
@@ -307,6 +375,13 @@ class StandardsChatWindow(forms.WPFWindow):
                     pass
                 self.typing_timer = None
             
+            # Persist the last exchange if the history save is still debounced
+            if getattr(self, 'history_manager', None) is not None:
+                try:
+                    self.history_manager.flush()
+                except Exception:
+                    pass
+            
             # Clear references to help GC
             self.config = None
             self.standards_client = None
@@ -736,7 +811,7 @@ class StandardsChatWindow(forms.WPFWindow):
         # Divider line
         divider = Border()
         divider.Height = 1
-        divider.Background = SolidColorBrush(Color.FromRgb(0xE0, 0xE0, 0xE0))
+        divider.Background = _DIVIDER_BRUSH
         divider.Margin = Thickness(0, 0, 0, 8)
         divider.HorizontalAlignment = HorizontalAlignment.Left
         divider.Width = 200
@@ -1106,7 +1181,6 @@ class StandardsChatWindow(forms.WPFWindow):
         timestamp = session_data.get('timestamp', '')
         if timestamp:
             try:
-                from datetime import datetime
                 if '.' in timestamp:
                     dt = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%f")
                 else:
@@ -1264,7 +1338,6 @@ class StandardsChatWindow(forms.WPFWindow):
                     self.Dispatcher.Invoke(self.start_streaming_response)
                     debug_log("start_streaming_response invoked")
                 except Exception as start_err:
-                    import traceback
                     safe_print("ERROR: Failed to invoke start_streaming_response: {}".format(safe_str(start_err)))
                     debug_log("ERROR invoking start_streaming_response: {}\n{}".format(
                         safe_str(start_err), traceback.format_exc()
@@ -1275,15 +1348,11 @@ class StandardsChatWindow(forms.WPFWindow):
                 # Callback for streaming chunks
                 def on_chunk(text_chunk):
                     try:
-                        # Capture text_chunk value in closure to avoid lambda capture issues
-                        chunk_to_append = text_chunk
                         try:
-                            self.Dispatcher.Invoke(
-                                lambda: self.append_to_streaming_response(chunk_to_append)
-                            )
+                            self._queue_streaming_chunk(text_chunk)
                         except Exception as disp_err:
-                            safe_print("ERROR: Dispatcher.Invoke failed: {}".format(safe_str(disp_err)))
-                            debug_log("ERROR: Dispatcher.Invoke failed: {}".format(safe_str(disp_err)))
+                            safe_print("ERROR: Dispatcher.BeginInvoke failed: {}".format(safe_str(disp_err)))
+                            debug_log("ERROR: Dispatcher.BeginInvoke failed: {}".format(safe_str(disp_err)))
                     except Exception as e:
                         safe_print(u"ERROR in on_chunk callback: {}".format(safe_str(e)))
                         debug_log(u"ERROR in on_chunk callback: {}".format(safe_str(e)))
@@ -1376,7 +1445,6 @@ class StandardsChatWindow(forms.WPFWindow):
                 )
                 
             except Exception as e:
-                import traceback
                 tb = traceback.format_exc()
                 safe_print("Error processing query: " + safe_str(e))
                 safe_print(tb)
@@ -1384,14 +1452,11 @@ class StandardsChatWindow(forms.WPFWindow):
                 # Write traceback to log file for debugging
                 # Each write is independent so partial failures don't lose earlier lines
                 try:
-                    import os, io as _io
-                    from datetime import datetime
-                    from standards_chat.utils import safe_str_ascii, ascii_safe
                     log_dir = os.path.join(os.environ.get('APPDATA', ''), 'BBB', 'StandardsAssistant')
                     if not os.path.exists(log_dir):
                         os.makedirs(log_dir)
                     log_path = os.path.join(log_dir, 'error_log.txt')
-                    f = _io.open(log_path, 'a', encoding='utf-8')
+                    f = io.open(log_path, 'a', encoding='utf-8')
                     try:
                         f.write(u"\n=== {} ===\n".format(datetime.now().isoformat()))
                     except Exception:
@@ -1416,7 +1481,6 @@ class StandardsChatWindow(forms.WPFWindow):
                 # Show simpler error to user but invalid COM object specifically
                 # Ultra-safe error message creation - never let Unicode through
                 try:
-                    from standards_chat.utils import safe_str_ascii
                     err_text = safe_str_ascii(e)
                     if "COM object" in err_text and "RCW" in err_text:
                         err_text += "\n(Revit API context lost during background processing)"
@@ -1431,11 +1495,13 @@ class StandardsChatWindow(forms.WPFWindow):
                     try:
                         # Start the streaming bubble if it was never opened
                         # (error occurred before start_streaming_response was called)
-                        if not getattr(self, 'streaming_border', None):
+                        if self.streaming_border is None:
                             self.start_streaming_response()
+                        # Drop any streamed text still waiting to be rendered
+                        self._take_pending_chunks()
                         friendly_text = u"Sorry, something went wrong while processing your request."
                         self.streaming_text = friendly_text
-                        if hasattr(self, 'streaming_textblock') and self.streaming_textblock:
+                        if self.streaming_textblock is not None:
                             self.streaming_textblock.Inlines.Clear()
                             self._add_formatted_text(self.streaming_textblock, friendly_text)
                         # Force the DCT ticket button to appear
@@ -1489,9 +1555,8 @@ class StandardsChatWindow(forms.WPFWindow):
     
     def rotate_loading_message(self, sender, e):
         """Rotates through cute loading messages"""
-        if hasattr(self, 'typing_status_text') and self.typing_status_text:
-            message = random.choice(self.loading_messages)
-            self.typing_status_text.Text = message
+        if self.typing_status_text is not None:
+            self.typing_status_text.Text = next(self._loading_cycle)
 
     def add_typing_indicator(self):
         """Add animated typing indicator bubble with status text on same line"""
@@ -1531,7 +1596,7 @@ class StandardsChatWindow(forms.WPFWindow):
 
         # Status text on same line as dots
         status_text = TextBlock()
-        status_text.Text = random.choice(self.loading_messages)
+        status_text.Text = next(self._loading_cycle)
         status_text.FontSize = 11
         status_text.Foreground = self.FindResource("TextSecondaryColor")
         status_text.Margin = Thickness(8, 0, 0, 0)
@@ -1586,7 +1651,7 @@ class StandardsChatWindow(forms.WPFWindow):
     
     def update_typing_status(self, status):
         """Update the typing indicator status text"""
-        if hasattr(self, 'typing_status_text') and self.typing_status_text:
+        if self.typing_status_text is not None:
             self.Dispatcher.Invoke(
                 lambda: setattr(self.typing_status_text, 'Text', status)
             )
@@ -1640,12 +1705,37 @@ class StandardsChatWindow(forms.WPFWindow):
         # Scroll to bottom
         self.message_scrollviewer.ScrollToBottom()
     
+    def _queue_streaming_chunk(self, text_chunk):
+        """Queue a streamed chunk and schedule one batched render (any thread)"""
+        with self._chunk_lock:
+            self._pending_chunks.append(text_chunk)
+            if self._chunk_flush_scheduled:
+                return
+            self._chunk_flush_scheduled = True
+        self.Dispatcher.BeginInvoke(
+            DispatcherPriority.Background,
+            System.Action(self._flush_streaming_chunks)
+        )
+
+    def _take_pending_chunks(self):
+        """Remove and return all queued chunks as one string"""
+        with self._chunk_lock:
+            chunks = self._pending_chunks
+            self._pending_chunks = []
+            self._chunk_flush_scheduled = False
+        return u''.join(safe_str(c) for c in chunks)
+
+    def _flush_streaming_chunks(self):
+        """Render every queued chunk in a single pass (UI thread)"""
+        text = self._take_pending_chunks()
+        if text:
+            self.append_to_streaming_response(text)
+
     def append_to_streaming_response(self, text_chunk):
         """Append text chunk to streaming response"""
         try:
-            if hasattr(self, 'streaming_textblock') and self.streaming_textblock:
+            if self.streaming_textblock is not None:
                 # Convert to Python unicode and sanitize to ASCII immediately
-                from standards_chat.utils import safe_str, ascii_safe
                 text_chunk = ascii_safe(safe_str(text_chunk))
 
                 # Defensive: ensure streaming_text is also Python unicode
@@ -1655,8 +1745,8 @@ class StandardsChatWindow(forms.WPFWindow):
                 # Now both are ASCII-safe Python unicode - safe to concatenate
                 self.streaming_text = self.streaming_text + text_chunk
 
-                # Re-render with formatting
-                self.streaming_textblock.Inlines.Clear()
+                # Re-render with formatting, reusing the previous pass's Runs
+                self._recycle_runs(self.streaming_textblock)
                 self._add_formatted_text(self.streaming_textblock, self.streaming_text)
 
                 # Scroll to bottom
@@ -1667,9 +1757,6 @@ class StandardsChatWindow(forms.WPFWindow):
             safe_print("ERROR in append_to_streaming_response: {}".format(safe_str(e)))
             # Log to file since pyRevit console may be disposed
             try:
-                import os, io, traceback
-                from standards_chat.utils import safe_str_ascii, ascii_safe
-                from datetime import datetime
                 log_dir = os.path.join(os.environ.get('APPDATA', ''), 'BBB', 'StandardsAssistant')
                 if not os.path.exists(log_dir):
                     os.makedirs(log_dir)
@@ -1684,7 +1771,9 @@ class StandardsChatWindow(forms.WPFWindow):
     def finish_streaming_response(self, sources):
         """Add sources and apply formatting to completed streaming response"""
         try:
-            if hasattr(self, 'streaming_textblock') and self.streaming_textblock:
+            # Render chunks whose batched flush has not run yet
+            self._flush_streaming_chunks()
+            if self.streaming_textblock is not None:
                 # Check for actions in the response FIRST
                 actions = parse_action_from_response(self.streaming_text)
                 
@@ -1757,7 +1846,7 @@ class StandardsChatWindow(forms.WPFWindow):
                     show_dct = True
                 if sources:
                     sources_panel = self._create_sources_panel(sources)
-                    if sources_panel and hasattr(self, 'streaming_content_stack'):
+                    if sources_panel and self.streaming_content_stack is not None:
                         self.streaming_content_stack.Children.Add(sources_panel)
                 
                 # Show DCT button whenever search confidence was too low, regardless of
@@ -1780,7 +1869,6 @@ class StandardsChatWindow(forms.WPFWindow):
             self.streaming_border = None
             self.streaming_text = u""
         except Exception as e:
-            from standards_chat.utils import safe_str_ascii
             safe_print("Error in finish_streaming_response: {}".format(safe_str_ascii(e)))
             # Don't crash processing, just finish up
             self.streaming_textblock = None
@@ -1886,7 +1974,6 @@ class StandardsChatWindow(forms.WPFWindow):
                 self.action_executor.execute_action(action_data, callback=on_action_complete)
         
         except Exception as e:
-            from standards_chat.utils import safe_str_ascii
             forms.alert(
                 "Error executing action:\n{}".format(safe_str_ascii(e)),
                 title="Error",
@@ -1999,26 +2086,82 @@ class StandardsChatWindow(forms.WPFWindow):
         # Scroll to bottom
         self.message_scrollviewer.ScrollToBottom()
     
+    def _get_run(self, text):
+        """Return a Run with the given text, reusing a pooled one if available"""
+        pool = StandardsChatWindow._run_pool
+        if not pool:
+            return Run(text)
+        run = pool.pop()
+        # Drop formatting from its previous use so inherited values apply
+        run.ClearValue(Run.FontWeightProperty)
+        run.ClearValue(Run.FontSizeProperty)
+        run.Text = text
+        return run
+
+    def _recycle_runs(self, textblock):
+        """Clear a TextBlock and return its top-level Runs to the pool"""
+        pool = StandardsChatWindow._run_pool
+        runs = [inline for inline in textblock.Inlines if isinstance(inline, Run)]
+        textblock.Inlines.Clear()
+        for run in runs:
+            if len(pool) >= pool.maxlen:
+                break
+            pool.append(run)
+
+    def _add_bold_runs(self, textblock, content):
+        """Add content with **bold** spans using str.find, without a regex or split list.
+
+        Used for the plain text between _INLINE_MD_RE tokens: a span needs at
+        least one character between its markers.
+        """
+        i = 0
+        while True:
+            j = content.find(u'**', i)
+            if j < 0:
+                break
+            k = content.find(u'**', j + 3)
+            if k < 0:
+                break
+            if j > i:
+                textblock.Inlines.Add(self._get_run(content[i:j]))
+            run = self._get_run(content[j + 2:k])
+            run.FontWeight = System.Windows.FontWeights.Bold
+            textblock.Inlines.Add(run)
+            i = k + 2
+        if i < len(content):
+            textblock.Inlines.Add(self._get_run(content[i:]))
+
+    def _add_plain_runs(self, textblock, content):
+        """Add text that holds no links or citations (Case 4: plain text with bold)"""
+        if u'**' in content:
+            self._add_bold_runs(textblock, content)
+        else:
+            textblock.Inlines.Add(self._get_run(content))
+
     def _add_formatted_text(self, textblock, text, sources=None):
         """Add text with basic markdown formatting"""
         try:
-            from standards_chat.utils import ascii_safe, safe_str_ascii
-            
-            # CRITICAL: Ensure text is ASCII-safe BEFORE any processing
+            # CRITICAL: Ensure text is ASCII-safe BEFORE any processing.
+            # Text is ASCII-safe from here on; all substrings of text remain
+            # ASCII-safe, so lines and parts need no further sanitizing.
             text = ascii_safe(text)
             
-            import re
+            # Fast path: plain text goes straight to TextBlock.Text so WPF can
+            # use its single-string renderer instead of building Inlines
+            if textblock.Inlines.Count == 0 and not _ANY_MD_RE.search(text):
+                textblock.Text = text
+                return
             
             lines = text.split(u'\n')
             
             for i, line in enumerate(lines):
                 if i > 0:
-                    textblock.Inlines.Add(Run(u"\n"))
+                    textblock.Inlines.Add(self._get_run(u"\n"))
                 
                 # Handle headers (make bold and slightly larger)
                 if line.strip().startswith(u'#'):
                     header_text = line.strip().lstrip(u'#').strip()
-                    run = Run(u"\n" + header_text + u"\n")
+                    run = self._get_run(u"\n" + header_text + u"\n")
                     run.FontWeight = System.Windows.FontWeights.Bold
                     run.FontSize = 15
                     textblock.Inlines.Add(run)
@@ -2030,35 +2173,36 @@ class StandardsChatWindow(forms.WPFWindow):
                 if line.strip().startswith(u'- ') or line.strip().startswith(u'* '):
                     prefix = u"  * "  # Use ASCII asterisk instead of Unicode bullet
                     content = line.strip()[2:]
-                # Handle numbered lists
-                elif re.match(u'^\\d+\\.\\s', line.strip()):
-                    match = re.match(u'^(\\d+\\.\\s)(.*)', line.strip())
-                    prefix = u"  " + match.group(1)
-                    content = match.group(2)
+                else:
+                    # Handle numbered lists
+                    match = _NUMBERED_ITEM_RE.match(line.strip())
+                    if match:
+                        prefix = u"  " + match.group(1)
+                        content = match.group(2)
                 
                 if prefix:
-                    textblock.Inlines.Add(Run(prefix))
+                    textblock.Inlines.Add(self._get_run(prefix))
                 
-                try:
-                    # Process inline formatting (Bold, Links, Citations)
-                    # Regex for markdown links: [text](url)
-                    # Regex for citations: [1], [15], etc.
-                    # Split pattern captures all interesting parts
-                    # Capture groups: 1=Link, 2=Citation, 3=RawURL
-                    
-                    split_pattern = u'(\\[[^\\]]+\\]\\([^)]+\\))|(\\[\\d+\\])|(https?://[^\\s]+)'
-                    parts = re.split(split_pattern, content)
+                # Lines without inline markers need only a single Run; lines
+                # whose only markers are ** use a plain index scan for bold
+                if u'[' not in content and u'://' not in content:
+                    if content:
+                        self._add_plain_runs(textblock, content)
+                    continue
                 
-                    for part in parts:
-                        if not part: continue
-                        
-                        # Ensure every part is ASCII-safe before processing
-                        part = ascii_safe(part)
+                try:
+                    # Process inline formatting (Links, Citations, Raw URLs)
+                    # in a single scan; plain text between tokens gets bold.
+                    pos = 0
+                    for m in _INLINE_MD_RE.finditer(content):
+                        start = m.start()
+                        if start > pos:
+                            self._add_plain_runs(textblock, content[pos:start])
+                        pos = m.end()
                         
                         # Case 1: Citations [1]
-                        citation_match = re.match(u'^\\[(\\d+)\\]$', part)
-                        if citation_match:
-                            index = int(citation_match.group(1))
+                        if m.group('cite'):
+                            index = int(m.group('cite_num'))
                             
                             # Create small citation link
                             hlink = Hyperlink()
@@ -2075,7 +2219,8 @@ class StandardsChatWindow(forms.WPFWindow):
                                 # Clean title
                                 if title.lower().endswith(" - sharepoint page"): title = title[:-17]
                                 elif title.lower().endswith(" sharepoint page"): title = title[:-16]
-                                # Ensure title is ASCII-safe for tooltip
+                                # Source titles come from outside text, so they
+                                # still need sanitizing for the tooltip
                                 tooltip_text = ascii_safe(title)
                                 target_url = source.get('url')
                                 
@@ -2088,20 +2233,18 @@ class StandardsChatWindow(forms.WPFWindow):
                                 hlink.Cursor = System.Windows.Input.Cursors.Hand
 
                             # Content
-                            run = Run(part)
+                            run = Run(m.group('cite'))
                             run.FontSize = 10 
                             run.FontWeight = System.Windows.FontWeights.SemiBold
                             # run.BaselineAlignment = System.Windows.BaselineAlignment.Superscript
                             hlink.Inlines.Add(run)
                             
                             textblock.Inlines.Add(hlink)
-                            continue
 
                         # Case 2: Markdown Links [text](url)
-                        link_match = re.match(u'\\[([^\\]]+)\\]\\(([^)]+)\\)', part)
-                        if link_match:
-                            link_text = link_match.group(1)
-                            link_url = link_match.group(2)
+                        elif m.group('link'):
+                            link_text = m.group('link_text')
+                            link_url = m.group('link_url')
                             
                             hyperlink = Hyperlink()
                             hyperlink.Inlines.Add(Run(link_text))
@@ -2112,10 +2255,10 @@ class StandardsChatWindow(forms.WPFWindow):
                                 textblock.Inlines.Add(hyperlink)
                             except:
                                 textblock.Inlines.Add(Run(link_text))
-                            continue
                             
                         # Case 3: Raw URLs
-                        if re.match(u'^https?://', part):
+                        else:
+                            part = m.group('url')
                             hyperlink = Hyperlink()
                             hyperlink.Inlines.Add(Run(part))
                             try:
@@ -2125,32 +2268,24 @@ class StandardsChatWindow(forms.WPFWindow):
                                 textblock.Inlines.Add(hyperlink)
                             except:
                                 textblock.Inlines.Add(Run(part))
-                            continue
-                        
-                        # Case 4: Plain text with bold
-                        if u'**' in part:
-                            bold_parts = re.split(u'(\\*\\*.*?\\*\\*)', part)
-                            for bold_part in bold_parts:
-                                if bold_part.startswith(u'**') and bold_part.endswith(u'**'):
-                                    run = Run(bold_part[2:-2])
-                                    run.FontWeight = System.Windows.FontWeights.Bold
-                                    textblock.Inlines.Add(run)
-                                elif bold_part:
-                                    textblock.Inlines.Add(Run(bold_part))
-                        else:
-                            textblock.Inlines.Add(Run(part))
+                    
+                    if pos < len(content):
+                        self._add_plain_runs(textblock, content[pos:])
                             
                 except Exception as line_error:
-                    safe_print(u"ERROR processing line in _add_formatted_text: {}".format(safe_str_ascii(line_error)))
+                    # Only pay for formatting the message when debugging
+                    if _DEBUG_FORMAT:
+                        safe_print(u"ERROR processing line in _add_formatted_text: {}".format(safe_str_ascii(line_error)))
                     # Add the line as plain text if formatting fails
+                    # (line is a substring of the already ASCII-safe text)
                     try:
-                        textblock.Inlines.Add(Run(ascii_safe(line)))
+                        textblock.Inlines.Add(Run(line))
                     except:
                         pass
         except Exception as e:
             safe_print(u"ERROR in _add_formatted_text: {}".format(safe_str_ascii(e)))
-            import traceback
-            safe_print(u"Traceback: {}".format(safe_str_ascii(traceback.format_exc())))
+            if _DEBUG_FORMAT:
+                safe_print(u"Traceback: {}".format(safe_str_ascii(traceback.format_exc())))
             # Add text as plain if formatting completely fails
             try:
                 textblock.Inlines.Add(Run(ascii_safe(text)))
@@ -2246,7 +2381,6 @@ class StandardsChatWindow(forms.WPFWindow):
         from System.Windows.Controls import Grid, ColumnDefinition, RowDefinition
         from System.Windows.Media import SolidColorBrush, Color
         from System.Windows import GridLength, GridUnitType, CornerRadius
-        from standards_chat.utils import ascii_safe
 
         n_cols = max(len(r) for r in rows)
         if n_cols == 0:
@@ -2337,7 +2471,6 @@ class StandardsChatWindow(forms.WPFWindow):
 
     def on_hyperlink_click(self, sender, args):
         """Open hyperlink in browser"""
-        import webbrowser
         try:
             webbrowser.open(args.Uri.ToString())
         except Exception as e:
@@ -2347,23 +2480,14 @@ class StandardsChatWindow(forms.WPFWindow):
     def _add_dct_ticket_panel(self):
         """Add DCT support button inside the chat bubble with a rotating message"""
         try:
-            if not hasattr(self, 'streaming_border') or not self.streaming_border:
+            if self.streaming_border is None:
                 return
 
             from System.Windows.Controls import StackPanel, Button, Separator
             from System.Windows.Documents import Run
 
-            # Rotating playful messages
-            messages = [
-                u"Hmm, I'm stumped. Maybe it's time to ask the humans!",
-                u"This one's beyond me -- the DCT team will know!",
-                u"I've hit my limit. The real experts can help from here.",
-                u"Not in my notes! Let's get a human on this one.",
-                u"Time to phone a friend? DCT's got your back.",
-                u"Even I have my blind spots. The team can help!",
-                u"I wish I knew! DCT will have the answer though.",
-            ]
-            message = messages[random.randint(0, len(messages) - 1)]
+            # Rotating playful message
+            message = random.choice(_DCT_MESSAGES)
 
             # Get existing content from the bubble border
             existing_child = self.streaming_border.Child
@@ -2376,8 +2500,8 @@ class StandardsChatWindow(forms.WPFWindow):
             # Subtle divider line
             divider = Border()
             divider.Height = 1
-            divider.Background = SolidColorBrush(Color.FromRgb(0xE0, 0xE0, 0xE0))
-            divider.Margin = Thickness(0, 12, 0, 10)
+            divider.Background = _DIVIDER_BRUSH
+            divider.Margin = _DCT_DIVIDER_MARGIN
             inner_stack.Children.Add(divider)
 
             # Message text
@@ -2386,40 +2510,26 @@ class StandardsChatWindow(forms.WPFWindow):
             msg_text.TextWrapping = TextWrapping.Wrap
             msg_text.FontSize = 12
             msg_text.FontStyle = System.Windows.FontStyles.Italic
-            msg_text.Foreground = SolidColorBrush(Color.FromRgb(0x60, 0x60, 0x60))
-            msg_text.Margin = Thickness(0, 0, 0, 8)
+            msg_text.Foreground = _DCT_MESSAGE_BRUSH
+            msg_text.Margin = _DCT_MESSAGE_MARGIN
             inner_stack.Children.Add(msg_text)
 
             # Button with rounded corners via ControlTemplate
-            from System.Windows.Controls import ControlTemplate, ContentPresenter
-            from System.Windows.Markup import XamlReader as BtnXamlReader
+            if StandardsChatWindow._dct_template is None:
+                self._init_dct_button_resources()
+
+            normal_bg = StandardsChatWindow._dct_normal_bg
+            hover_bg = StandardsChatWindow._dct_hover_bg
 
             button = Button()
-            button.Background = self.FindResource("PrimaryColor")
+            button.Background = normal_bg
             button.Foreground = Brushes.White
             button.Padding = Thickness(14, 8, 16, 8)
             button.BorderThickness = Thickness(0)
             button.HorizontalAlignment = HorizontalAlignment.Left
             button.Cursor = System.Windows.Input.Cursors.Hand
 
-            # Rounded corner template
-            template_xaml = u"""<ControlTemplate
-                xmlns="http://schemas.microsoft.com/winfx/2006/xaml/presentation"
-                xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml"
-                TargetType="Button">
-                <Border x:Name="border"
-                        Background="{TemplateBinding Background}"
-                        CornerRadius="6"
-                        Padding="{TemplateBinding Padding}">
-                    <ContentPresenter HorizontalAlignment="Center" VerticalAlignment="Center"/>
-                </Border>
-                <ControlTemplate.Triggers>
-                    <Trigger Property="IsEnabled" Value="False">
-                        <Setter Property="Opacity" Value="0.6"/>
-                    </Trigger>
-                </ControlTemplate.Triggers>
-            </ControlTemplate>"""
-            button.Template = BtnXamlReader.Parse(template_xaml)
+            button.Template = StandardsChatWindow._dct_template
 
             # Button content: icon + text in a horizontal stack
             btn_content = StackPanel()
@@ -2450,8 +2560,6 @@ class StandardsChatWindow(forms.WPFWindow):
             button.Click += self._on_dct_button_click
 
             # Hover effects
-            normal_bg = self.FindResource("PrimaryColor")
-            hover_bg = SolidColorBrush(Color.FromRgb(0x00, 0x5A, 0x9E))
             button.MouseEnter += lambda s, e: s.SetValue(Button.BackgroundProperty, hover_bg)
             button.MouseLeave += lambda s, e: s.SetValue(Button.BackgroundProperty, normal_bg)
 
@@ -2463,9 +2571,50 @@ class StandardsChatWindow(forms.WPFWindow):
         except Exception as e:
             safe_print(u"Error creating DCT ticket panel (non-critical): {}".format(safe_str(e))[:200])
     
+    def _init_dct_button_resources(self):
+        """Build the DCT button template and brushes once per session"""
+        from System.Windows import (
+            FrameworkElementFactory, TemplateBindingExtension, Trigger, Setter,
+            UIElement, CornerRadius, VerticalAlignment
+        )
+        from System.Windows.Controls import ControlTemplate, ContentPresenter, Control
+
+        # Rounded corner template, built directly rather than parsed from XAML:
+        # Border(Background, Padding bound to the button; CornerRadius 6)
+        #   > ContentPresenter(centred), dimmed to 0.6 opacity when disabled
+        presenter = FrameworkElementFactory(clr.GetClrType(ContentPresenter))
+        presenter.SetValue(ContentPresenter.HorizontalAlignmentProperty, HorizontalAlignment.Center)
+        presenter.SetValue(ContentPresenter.VerticalAlignmentProperty, VerticalAlignment.Center)
+
+        border = FrameworkElementFactory(clr.GetClrType(Border), "border")
+        border.SetValue(Border.BackgroundProperty, TemplateBindingExtension(Control.BackgroundProperty))
+        border.SetValue(Border.PaddingProperty, TemplateBindingExtension(Control.PaddingProperty))
+        border.SetValue(Border.CornerRadiusProperty, CornerRadius(6))
+        border.AppendChild(presenter)
+
+        disabled = Trigger()
+        disabled.Property = UIElement.IsEnabledProperty
+        disabled.Value = False
+        disabled.Setters.Add(Setter(UIElement.OpacityProperty, 0.6))
+
+        template = ControlTemplate(clr.GetClrType(Button))
+        template.VisualTree = border
+        template.Triggers.Add(disabled)
+        template.Seal()
+
+        normal_bg = self.FindResource("PrimaryColor")
+        if normal_bg.CanFreeze and not normal_bg.IsFrozen:
+            normal_bg = normal_bg.Clone()
+            normal_bg.Freeze()
+
+        hover_bg = frozen_brush(0x00, 0x5A, 0x9E)
+
+        StandardsChatWindow._dct_normal_bg = normal_bg
+        StandardsChatWindow._dct_hover_bg = hover_bg
+        StandardsChatWindow._dct_template = template
+
     def _on_dct_button_click(self, sender, args):
         """Handle DCT ticket button click"""
-        import webbrowser
         try:
             button = sender
             url = button.Tag
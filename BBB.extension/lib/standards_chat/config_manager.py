@@ -7,6 +7,41 @@ Handles loading and accessing configuration
 import os
 import io
 import json
+import errno
+import threading
+from datetime import datetime
+from standards_chat.utils import safe_print, safe_str
+
+try:
+    # Native JSON codec when available (CPython daemon/dev tooling only)
+    import orjson
+
+    def _loads(data):
+        # orjson rejects a UTF-8 BOM, which Windows editors like to add
+        if data[:3] == b'\xef\xbb\xbf':
+            data = data[3:]
+        return orjson.loads(data)
+
+    def _dumps(obj):
+        # Already UTF-8 bytes
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    # IronPython (Revit) and stock pyRevit CPython use the stdlib codec
+    def _loads(data):
+        # Decode the raw bytes read from disk first, so IronPython returns
+        # unicode values; utf-8-sig also drops a BOM
+        return json.loads(data.decode('utf-8-sig'))
+
+    def _dumps(obj):
+        # Encode once to UTF-8 bytes so callers write in binary mode instead
+        # of letting io.open(mode='w') run the text codec a second time
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+# Paths are fixed for the life of the process, so resolve them once at
+# import instead of on every ConfigManager() construction
+_EXTENSION_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+_USER_DATA_DIR = os.path.join(os.path.expanduser('~'), 'AppData', 'LocalLow', 'BBB', 'Kodama')
 
 
 class ConfigManager:
@@ -19,7 +54,7 @@ class ConfigManager:
         self.config_dir = os.path.join(self.extension_dir, 'config')
         
         # User preferences path (LocalLow)
-        self.user_data_dir = os.path.join(os.path.expanduser('~'), 'AppData', 'LocalLow', 'BBB', 'Kodama')
+        self.user_data_dir = _USER_DATA_DIR
         self.user_prefs_path = os.path.join(self.user_data_dir, 'user_preferences.json')
 
         # Load configuration files
@@ -29,22 +64,32 @@ class ConfigManager:
         # Load and merge user preferences
         self._load_and_merge_user_prefs()
 
+        # Sections changed by set_config() since the last write; flush()
+        # writes only these when a caller asks for it
+        self._dirty_user = False
+        self._dirty_central = False
+        self._flush_lock = threading.RLock()
+
+        # Dot-notation key paths already split by get_config()/set_config()
+        self._path_cache = {}
+
     def _load_and_merge_user_prefs(self):
         """Load user preferences from AppData and merge into config"""
         user_prefs = {}
-        if os.path.exists(self.user_prefs_path):
-            f = None
-            try:
-                f = io.open(self.user_prefs_path, 'r', encoding='utf-8')
-                user_prefs = json.load(f)
-            except Exception:
-                pass
-            finally:
-                if f:
-                    try:
-                        f.close()
-                    except:
-                        pass
+        # Single open (no separate exists() stat); a missing file simply
+        # means no preferences have been saved yet
+        f = None
+        try:
+            f = io.open(self.user_prefs_path, 'rb')
+            user_prefs = _loads(f.read())
+        except Exception:
+            pass
+        finally:
+            if f:
+                try:
+                    f.close()
+                except:
+                    pass
         
         self.config['user'] = user_prefs
 
@@ -57,19 +102,21 @@ class ConfigManager:
             except OSError:
                 pass
 
-        json_str = json.dumps(user_prefs, indent=2, ensure_ascii=False)
-        # json.dumps returns str in Python 3 (unicode) and str/unicode in IronPython 2.7.
-        # Normalise to text so io.open(mode='w') is happy in both runtimes.
-        if isinstance(json_str, bytes):
-            json_str = json_str.decode('utf-8')
+        data = _dumps(user_prefs)
 
         # Write to a temp file first, then replace — ensures the live file is
         # never left empty/corrupt if the process is killed mid-write.
         tmp_path = self.user_prefs_path + '.tmp'
         f = None
         try:
-            f = io.open(tmp_path, 'w', encoding='utf-8')
-            f.write(json_str)
+            f = io.open(tmp_path, 'wb')
+            f.write(data)
+            f.flush()
+            # Make sure the bytes are on disk before the rename publishes them
+            try:
+                os.fsync(f.fileno())
+            except (AttributeError, OSError):
+                pass
             f.close()
             f = None
             # Atomic replace (os.replace is available in Python 3.3+ and
@@ -100,25 +147,24 @@ class ConfigManager:
 
     def _get_extension_dir(self):
         """Get the extension directory path"""
-        # Navigate up from lib/standards_chat to extension root
-        current_file = __file__
-        lib_dir = os.path.dirname(os.path.dirname(current_file))
-        extension_dir = os.path.dirname(lib_dir)
-        return extension_dir
+        # Navigate up from lib/standards_chat to extension root (resolved at import)
+        return _EXTENSION_DIR
     
     def _load_json(self, filename):
         """Load JSON file from config directory"""
         filepath = os.path.join(self.config_dir, filename)
         
-        if not os.path.exists(filepath):
-            raise Exception(
-                "Configuration file not found: {}".format(filepath)
-            )
-        
         f = None
         try:
-            f = io.open(filepath, 'r', encoding='utf-8')
-            return json.load(f)
+            try:
+                f = io.open(filepath, 'rb')
+            except (IOError, OSError) as e:
+                if e.errno == errno.ENOENT:
+                    raise Exception(
+                        "Configuration file not found: {}".format(filepath)
+                    )
+                raise
+            return _loads(f.read())
         finally:
             if f:
                 try:
@@ -128,10 +174,20 @@ class ConfigManager:
     
     def get(self, section, key, default=None):
         """Get configuration value"""
-        try:
-            return self.config[section][key]
-        except KeyError:
+        # Plain lookups: misses are common (optional settings) and should not
+        # pay for raising and catching KeyError
+        sec = self.config.get(section)
+        if sec is None:
             return default
+        return sec.get(key, default)
+    
+    def _split_key_path(self, key_path):
+        """Split a dot-notation key path once and memoize the key tuple"""
+        keys = self._path_cache.get(key_path)
+        if keys is None:
+            keys = tuple(key_path.split('.'))
+            self._path_cache[key_path] = keys
+        return keys
     
     def get_config(self, key_path, default=None):
         """
@@ -144,7 +200,7 @@ class ConfigManager:
         Returns:
             Configuration value or default
         """
-        keys = key_path.split('.')
+        keys = self._split_key_path(key_path)
         value = self.config
         
         try:
@@ -162,47 +218,76 @@ class ConfigManager:
             key_path: Dot-separated path to config value (e.g. 'vector_search.last_sync_timestamp')
             value: Value to set
         """
-        keys = key_path.split('.')
-        config = self.config
-        
-        # Navigate to parent
-        for key in keys[:-1]:
-            if key not in config:
-                config[key] = {}
-            config = config[key]
+        keys = self._split_key_path(key_path)
         
-        # Set value
-        config[keys[-1]] = value
+        with self._flush_lock:
+            config = self.config
+            
+            # Navigate to parent
+            for key in keys[:-1]:
+                if key not in config:
+                    config[key] = {}
+                config = config[key]
+            
+            # Set value
+            config[keys[-1]] = value
+            
+            if keys[0] == 'user':
+                self._dirty_user = True
+            else:
+                self._dirty_central = True
+    
+    def flush(self):
+        """
+        Write only the parts of the configuration changed by set_config()
+        since the last write. User settings go to AppData, everything else to
+        config.json. Nothing is written until a caller asks for it.
+        """
+        with self._flush_lock:
+            if self._dirty_user:
+                self._dirty_user = False
+                self._save_user_prefs(self.config.get('user', {}))
+            if self._dirty_central:
+                self._dirty_central = False
+                try:
+                    self._save_central_config()
+                except (IOError, OSError) as e:
+                    # Leave it dirty so a later flush() tries again
+                    self._dirty_central = True
+                    safe_print("Error saving config.json: {}".format(safe_str(e)))
     
     def save(self):
         """
         Save current configuration.
         Splits 'user' settings to AppData and the rest to config.json.
         """
-        # 1. Save User Prefs
-        if 'user' in self.config:
-            self._save_user_prefs(self.config['user'])
+        with self._flush_lock:
+            self._dirty_user = False
+            self._dirty_central = False
+            
+            # 1. Save User Prefs
+            if 'user' in self.config:
+                self._save_user_prefs(self.config['user'])
 
-        # 2. Save Central Config
-        # Create a copy without the user section to avoid writing it back to central
-        config_to_save = self.config.copy()
-        if 'user' in config_to_save:
-            del config_to_save['user']
+            # 2. Save Central Config
+            self._save_central_config()
 
-        # python_path is machine-specific -- strip it so the shared network
-        # config.json stays clean and other users don't inherit a path that
-        # only resolves on one machine.
-        import copy as _copy
-        vs = config_to_save.get('vector_search', {})
-        if isinstance(vs, dict) and 'python_path' in vs:
-            config_to_save['vector_search'] = _copy.copy(vs)
-            del config_to_save['vector_search']['python_path']
+    def _save_central_config(self):
+        """Write everything except the 'user' section to config.json"""
+        # Build the copy in one pass: drop the user section to avoid writing it
+        # back to central, and strip python_path from vector_search -- it is
+        # machine-specific, so the shared network config.json stays clean and
+        # other users don't inherit a path that only resolves on one machine.
+        config_to_save = {
+            k: (self._strip_python_path(v) if k == 'vector_search' else v)
+            for k, v in self.config.items() if k != 'user'
+        }
 
         filepath = os.path.join(self.config_dir, 'config.json')
         f = None
         try:
-            f = open(filepath, 'w')
-            json.dump(config_to_save, f, indent=2)
+            f = io.open(filepath, 'wb')
+            f.write(_dumps(config_to_save))
         finally:
             if f:
                 try:
@@ -210,13 +295,20 @@ class ConfigManager:
                 except:
                     pass
 
+    @staticmethod
+    def _strip_python_path(vs):
+        """Return vector_search settings without the machine-specific python_path"""
+        if isinstance(vs, dict) and 'python_path' in vs:
+            return {k: v for k, v in vs.items() if k != 'python_path'}
+        return vs
+
     def save_api_keys(self):
         """Save API keys to api_keys.json"""
         filepath = os.path.join(self.config_dir, 'api_keys.json')
         f = None
         try:
-            f = open(filepath, 'w')
-            json.dump(self.api_keys, f, indent=2)
+            f = io.open(filepath, 'wb')
+            f.write(_dumps(self.api_keys))
         finally:
             if f:
                 try:
@@ -260,8 +352,6 @@ class ConfigManager:
     
     def mark_disclaimer_accepted(self):
         """Mark disclaimer as accepted and save to user preferences"""
-        from datetime import datetime
-        
         if 'user' not in self.config:
             self.config['user'] = {}
         
@@ -269,4 +359,7 @@ class ConfigManager:
         self.config['user']['disclaimer_accepted_date'] = datetime.now().isoformat()
         self.config['user']['disclaimer_version'] = '1.0'
         
-        self.save()
+        # Only user preferences changed -- skip rewriting the central config
+        with self._flush_lock:
+            self._dirty_user = True
+        self.flush()
@@ -12,13 +12,17 @@ The user can choose:
 """
 import os
 
-import clr
-clr.AddReference('PresentationFramework')
-clr.AddReference('PresentationCore')
-clr.AddReference('WindowsBase')
+from standards_chat import _wpf_init  # noqa: F401  (WPF assembly references)
 
 from pyrevit import forms
 
+from standards_chat.utils import load_wpf_window
+
+
+# lib/standards_chat/ → lib/
+_LIB_DIR   = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_XAML_PATH = os.path.join(_LIB_DIR, 'ui', 'db_update_prompt_window.xaml')
+
 
 class DBUpdatePromptWindow(forms.WPFWindow):
     """
@@ -30,11 +34,7 @@ class DBUpdatePromptWindow(forms.WPFWindow):
     """
 
     def __init__(self):
-        script_dir = os.path.dirname(__file__)
-        lib_dir    = os.path.dirname(script_dir)   # lib/standards_chat/ → lib/
-        xaml_path  = os.path.join(lib_dir, 'ui', 'db_update_prompt_window.xaml')
-
-        forms.WPFWindow.__init__(self, xaml_path)
+        load_wpf_window(self, _XAML_PATH)
 
         self.sync_now = False
 
@@ -10,27 +10,57 @@ Two display modes:
   startup=False – bottom-right toast; auto-closes 3 seconds after done.
 """
 import os
+import threading
 import time as _time
 
-import clr
-clr.AddReference('PresentationFramework')
-clr.AddReference('PresentationCore')
-clr.AddReference('WindowsBase')
+from standards_chat._wpf_init import frozen_brush  # also adds the WPF assembly references
 
 from System.Windows import SystemParameters, Visibility, WindowStartupLocation
-from System.Windows.Media import SolidColorBrush, Color
-from System.Windows.Threading import DispatcherTimer
-from System import TimeSpan
+from System.Windows.Threading import DispatcherTimer, DispatcherPriority
+from System import TimeSpan, Action
 
 from pyrevit import forms
 
+from standards_chat.utils import load_wpf_window
+
+
+# lib/standards_chat/ → lib/
+_LIB_DIR   = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_XAML_PATH = os.path.join(_LIB_DIR, 'ui', 'db_update_window.xaml')
+
+# Stopped DispatcherTimers left behind by closed windows; a sync toast can be
+# opened several times per Revit session
+_TIMER_POOL = []
+_TIMER_POOL_LOCK = threading.Lock()
+
+
+def _acquire_timer(interval_ms):
+    """Take a stopped DispatcherTimer from the pool (or create one)."""
+    with _TIMER_POOL_LOCK:
+        timer = _TIMER_POOL.pop() if _TIMER_POOL else None
+    if timer is None:
+        timer = DispatcherTimer()
+    timer.Interval = TimeSpan.FromMilliseconds(interval_ms)
+    return timer
+
+
+def _release_timer(timer, handler):
+    """Stop *timer*, detach *handler* and return it to the pool."""
+    timer.Stop()
+    if handler is not None:
+        timer.Tick -= handler
+    with _TIMER_POOL_LOCK:
+        _TIMER_POOL.append(timer)
+
 
 class DBUpdateWindow(forms.WPFWindow):
     """
     Progress window for the vector DB cache sync operation.
 
     Accepts the module-level ``_db_sync_status`` dict from
-    ``vector_db_interop`` and polls it every 600 ms via a DispatcherTimer.
+    ``vector_db_interop`` and registers itself as a status listener, so phase
+    and message changes are pushed to the UI thread as they happen.  A slow
+    DispatcherTimer runs only while syncing to refresh the elapsed counter.
 
     Args:
         status_dict  : The shared status dict (same threading model as
@@ -43,22 +73,23 @@ class DBUpdateWindow(forms.WPFWindow):
                           "Open Kodama" (startup mode only).
     """
 
-    _BLUE  = SolidColorBrush(Color.FromRgb(0,   120, 212))   # #0078D4
-    _GREEN = SolidColorBrush(Color.FromRgb(16,  124,  16))   # #107C10
-    _RED   = SolidColorBrush(Color.FromRgb(168,   0,   0))   # #A80000
-    _GREY  = SolidColorBrush(Color.FromRgb(96,   94,  92))   # #605E5C
+    _BLUE  = frozen_brush(0,   120, 212)   # #0078D4
+    _GREEN = frozen_brush(16,  124,  16)   # #107C10
+    _RED   = frozen_brush(168,   0,   0)   # #A80000
+    _GREY  = frozen_brush(96,   94,  92)   # #605E5C
 
-    def __init__(self, status_dict, startup=False, launch_callback=None):
-        script_dir = os.path.dirname(__file__)
-        lib_dir    = os.path.dirname(script_dir)   # lib/standards_chat/ → lib/
-        xaml_path  = os.path.join(lib_dir, 'ui', 'db_update_window.xaml')
+    _SYNCING_FALLBACK = u'Syncing\u2026'
 
-        forms.WPFWindow.__init__(self, xaml_path)
+    def __init__(self, status_dict, startup=False, launch_callback=None):
+        load_wpf_window(self, _XAML_PATH)
 
         self._status          = status_dict
         self._startup         = startup
         self._launch_callback = launch_callback
         self._done_since      = None   # timestamp when phase reached 'done' (toast auto-close)
+        self._last_status_text = None  # skip redundant StatusText writes
+        self._last_status_key  = None  # (message, elapsed) behind _last_status_text
+        self._dismissed        = False  # hidden by the title-row ✕; no more ticking
 
         # Wire buttons
         self.DismissButton.Click       += self._on_dismiss
@@ -74,11 +105,20 @@ class DBUpdateWindow(forms.WPFWindow):
         # Position on Loaded (after SizeToContent resolves the height)
         self.Loaded += self._on_loaded
 
-        # Poll status every 600 ms
-        self._timer = DispatcherTimer()
-        self._timer.Interval = TimeSpan.FromMilliseconds(600)
-        self._timer.Tick     += self._on_tick
-        self._timer.Start()
+        # Elapsed-seconds counter; only runs while the sync is in progress.
+        # Starts fast and backs off as the sync drags on (see _on_tick)
+        self._timer         = _acquire_timer(500)
+        self._timer_handler = self._on_tick
+        self._timer.Tick   += self._timer_handler
+        self.Closed        += self._on_closed
+
+        # Status changes are pushed by the sync thread (see post_status)
+        from standards_chat import vector_db_interop as _vdb
+        _vdb.register_status_listener(self)
+        self.Closed += lambda s, e: _vdb.unregister_status_listener(self)
+
+        # The sync may already have moved on before we registered
+        self._apply_status(dict(self._status))
 
     # ------------------------------------------------------------------
     # Positioning
@@ -114,7 +154,8 @@ class DBUpdateWindow(forms.WPFWindow):
     # ------------------------------------------------------------------
 
     def _on_dismiss(self, sender, args):
-        """Title-row ✕ — hide so sync continues but stop polling."""
+        """Title-row ✕ — hide so sync continues but stop the counter."""
+        self._dismissed = True
         self._timer.Stop()
         if self._startup:
             # In startup mode dismiss means "I'll open Kodama myself later"
@@ -139,32 +180,87 @@ class DBUpdateWindow(forms.WPFWindow):
             self._timer.Stop()
             self.Close()
 
+    def _on_closed(self, sender, args):
+        """Hand the timer back to the pool for the next toast."""
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            try:
+                _release_timer(timer, self._timer_handler)
+            except Exception:
+                pass
+        self._timer_handler = None
+
     # ------------------------------------------------------------------
-    # Timer tick
+    # Status updates
     # ------------------------------------------------------------------
 
-    def _on_tick(self, sender, args):
+    def post_status(self, status):
+        """Called from the sync thread — marshal onto the UI thread."""
+        self.Dispatcher.BeginInvoke(
+            DispatcherPriority.Background,
+            Action(lambda: self._apply_status(status))
+        )
+
+    def _apply_status(self, status):
+        if self._timer is None:
+            return   # window already closed; a queued update arrived late
         try:
-            phase   = self._status.get('phase',   'syncing')
-            message = self._status.get('message', u'')
-
-            if phase == 'syncing':
-                start = self._status.get('start_time')
-                if start:
-                    elapsed     = int(_time.time() - start)
-                    elapsed_str = u'  ({}s)'.format(elapsed)
-                else:
-                    elapsed_str = u''
-                self.StatusText.Text = (message or u'Syncing\u2026') + elapsed_str
+            phase = status.get('phase', 'syncing')
+
+            if phase in ('syncing', 'idle'):
+                if self._dismissed:
+                    return   # hidden: don't restart the counter behind the user's back
+                self._update_syncing_text(status)
+                if not self._timer.IsEnabled:
+                    self._timer.Start()
                 return   # keep spinner going
 
-            # Terminal state — stop polling and update UI
+            # Terminal state — stop the counter and update UI
             self._timer.Stop()
             self._apply_terminal_state(phase)
 
         except Exception:
             pass
 
+    def _on_tick(self, sender, args):
+        """Refresh the elapsed-seconds counter while syncing."""
+        try:
+            elapsed = self._update_syncing_text(self._status)
+            if elapsed is not None:
+                # 500 ms for the first 5 s, 1 s up to 30 s, then 2 s
+                if elapsed < 5:
+                    interval = 500
+                elif elapsed < 30:
+                    interval = 1000
+                else:
+                    interval = 2000
+                if self._timer.Interval.TotalMilliseconds != interval:
+                    self._timer.Interval = TimeSpan.FromMilliseconds(interval)
+        except Exception:
+            pass
+
+    def _update_syncing_text(self, status):
+        """Write the syncing message + elapsed counter; returns elapsed seconds."""
+        message = status.get('message', u'') or self._SYNCING_FALLBACK
+        start   = status.get('start_time')
+        elapsed = int(_time.time() - start) if start else None
+
+        # Most ticks land in the same second as the last one — skip building
+        # the string at all unless something visible changed
+        key = (message, elapsed)
+        if key == self._last_status_key:
+            return elapsed
+        self._last_status_key = key
+
+        if elapsed is not None:
+            text = message + u'  (' + str(elapsed) + u's)'
+        else:
+            text = message
+        if text != self._last_status_text:
+            self._last_status_text = text
+            self.StatusText.Text   = text
+        return elapsed
+
     # ------------------------------------------------------------------
     # Terminal-state UI update
     # ------------------------------------------------------------------
@@ -215,19 +311,21 @@ class DBUpdateWindow(forms.WPFWindow):
             pass
 
     def _start_auto_close_timer(self):
-        """Start a 3-second countdown timer to auto-close the toast."""
+        """Reuse the (stopped) status timer as a 3-second auto-close countdown."""
+        try:
+            self._timer.Stop()
+            self._timer.Tick    -= self._timer_handler
+            self._timer_handler  = self._on_auto_close
+            self._timer.Tick    += self._timer_handler
+            self._timer.Interval = TimeSpan.FromSeconds(3)
+            self._timer.Start()
+        except Exception:
+            pass
+
+    def _on_auto_close(self, sender, args):
         try:
-            auto_timer = DispatcherTimer()
-            auto_timer.Interval = TimeSpan.FromSeconds(3)
-
-            def _auto_close(s, e):
-                try:
-                    auto_timer.Stop()
-                    self.Close()
-                except Exception:
-                    pass
-
-            auto_timer.Tick += _auto_close
-            auto_timer.Start()
+            if self._timer is not None:
+                self._timer.Stop()
+            self.Close()
         except Exception:
             pass
@@ -9,9 +9,18 @@ import os
 import webbrowser
 import System
 
+from standards_chat.utils import load_wpf_window
+
+# This file is in lib/standards_chat/, so up one level to lib, then to ui
+_LIB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_XAML_PATH = os.path.join(_LIB_DIR, 'ui', 'disclaimer_window.xaml')
+
 class DisclaimerWindow(forms.WPFWindow):
     """First-time user disclaimer window"""
     
+    # Decoded + frozen Kodama icon, shared by every instance
+    _cached_icon = None
+    
     def __init__(self):
         """
         Initialize disclaimer window.
@@ -20,14 +29,8 @@ class DisclaimerWindow(forms.WPFWindow):
         acceptance.  Defaults to False (install panel skipped).
         """
         try:
-            # Create XAML path in ui folder
-            # This file is in lib/standards_chat/, so up one level to lib, then to ui
-            script_dir = os.path.dirname(__file__)
-            lib_dir = os.path.dirname(script_dir)
-            xaml_path = os.path.join(lib_dir, 'ui', 'disclaimer_window.xaml')
-            
             # Initialize WPF window
-            forms.WPFWindow.__init__(self, xaml_path)
+            load_wpf_window(self, _XAML_PATH)
 
             # True  → accepted + wants Kodama to set up & open now
             # False → accepted but wants to skip for now
@@ -36,7 +39,7 @@ class DisclaimerWindow(forms.WPFWindow):
             self._setup_needed = False
             
             # Load Kodama icon
-            self._load_kodama_icon(lib_dir)
+            self._load_kodama_icon(_LIB_DIR)
             
             # Wire up button events
             self.AcceptButton.Click   += self._accept_clicked
@@ -57,16 +60,22 @@ class DisclaimerWindow(forms.WPFWindow):
     def _load_kodama_icon(self, lib_dir):
         """Load and set the Kodama icon"""
         try:
-            from System.Windows.Media.Imaging import BitmapImage
-            kodama_icon_path = os.path.join(lib_dir, 'ui', 'avatars', 'Kodama.png')
-            
-            if os.path.exists(kodama_icon_path):
+            if DisclaimerWindow._cached_icon is None:
+                from System.Windows.Media.Imaging import BitmapImage
+                kodama_icon_path = os.path.join(lib_dir, 'ui', 'avatars', 'Kodama.png')
+                
+                if not os.path.exists(kodama_icon_path):
+                    return
                 bmp = BitmapImage()
                 bmp.BeginInit()
                 bmp.UriSource = System.Uri(kodama_icon_path)
                 bmp.CacheOption = System.Windows.Media.Imaging.BitmapCacheOption.OnLoad
                 bmp.EndInit()
-                self.KodamaIcon.Source = bmp
+                # Frozen bitmaps can be shared across windows without re-decoding
+                bmp.Freeze()
+                DisclaimerWindow._cached_icon = bmp
+            
+            self.KodamaIcon.Source = DisclaimerWindow._cached_icon
         except Exception:
             # If icon fails to load, just continue without it
             pass
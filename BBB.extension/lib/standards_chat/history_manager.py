@@ -4,15 +4,96 @@ History Manager
 Manages chat session history storage and retrieval
 """
 
+import io
+import re
 import json
 import os
+import errno
+import time
+import hashlib
+import threading
+import collections
 from datetime import datetime
 from standards_chat.utils import safe_print, safe_str
 
+# Session files are machine-read only, so they are written compact: no
+# indentation and no padding after separators
+_SEPARATORS = (',', ':')
+
+try:
+    # Native JSON codec when available (CPython tooling only)
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dump(obj, f):
+        # Already UTF-8 bytes
+        f.write(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS))
+except ImportError:
+    try:
+        import ujson
+
+        def _loads(data):
+            return ujson.loads(data)
+
+        def _dump(obj, f):
+            f.write(ujson.dumps(obj, ensure_ascii=True).encode('utf-8'))
+    except ImportError:
+        # IronPython (Revit) uses the stdlib codec
+        def _loads(data):
+            # Accepts the raw UTF-8 bytes read from disk
+            return json.loads(data.decode('utf-8'))
+
+        # ensure_ascii=True forces ascii, which is safest for avoiding codec errors
+        _ENCODER = json.JSONEncoder(ensure_ascii=True, separators=_SEPARATORS)
+
+        def _dump(obj, f):
+            # Stream the encoder's chunks into the buffered file rather than
+            # materializing the whole document as one string first
+            for chunk in _ENCODER.iterencode(obj):
+                f.write(chunk.encode('ascii'))
+
+
+# Sidecar holding {session_id: {'title', 'timestamp'}} so the history list
+# doesn't have to parse every conversation file
+_INDEX_FILENAME = '_index.json'
+
+# Session files are written with these keys first (see save_session), so the
+# listing fields can be read from the head of the file without parsing the
+# whole conversation.  Matches compact JSON string values, escapes included.
+_HEADER_BYTES = 2048
+_HEADER_RE = re.compile(
+    br'^\{"session_id":"((?:[^"\\]|\\.)*)",'
+    br'"title":"((?:[^"\\]|\\.)*)",'
+    br'"timestamp":"((?:[^"\\]|\\.)*)"'
+)
+
+# Failures we expect and recover from.  IOError is listed separately because
+# it is not an OSError alias under IronPython 2.7; ValueError covers bad JSON
+# and bad UTF-8, TypeError an unserializable conversation entry.
+_FILE_ERRORS = (IOError, OSError)
+_READ_ERRORS = (IOError, OSError, ValueError)
+_WRITE_ERRORS = (IOError, OSError, TypeError, ValueError)
+
+
+def _content_hash(title, conversation):
+    """Digest of the serialized (title, conversation) pair"""
+    buf = io.BytesIO()
+    try:
+        _dump([title, conversation], buf)
+    except (TypeError, ValueError):
+        # Unserializable content can't be compared; always let it save
+        return None
+    return hashlib.md5(buf.getvalue()).digest()
+
 
 class HistoryManager:
     """Manages chat history persistence in user's AppData"""
     
+    # Seconds to coalesce save_session() calls before writing them to disk
+    SAVE_DELAY = 2.0
+    
     def __init__(self):
         """Initialize history manager"""
         # Set up history directory in AppData
@@ -35,8 +116,30 @@ class HistoryManager:
         if not os.path.exists(self.history_dir):
             try:
                 os.makedirs(self.history_dir)
-            except Exception as e:
+            except _FILE_ERRORS as e:
                 safe_print("Error creating history directory: {}".format(safe_str(e)))
+        
+        # Debounced saves: latest session_data per session_id, written by flush()
+        self._pending_saves = {}
+        self._last_save_ts = 0
+        self._save_timer = None
+        self._save_lock = threading.RLock()
+        
+        # Session listing index (see _INDEX_FILENAME)
+        self._index_path = os.path.join(self.history_dir, _INDEX_FILENAME)
+        self._index_mtime = None
+        self._index = self._load_index()
+        
+        # session_id -> hash of the (title, conversation) last written or
+        # read, so an unchanged session is not rewritten
+        self._saved_content = {}
+        
+        # session_id -> title used by the last save_session() call
+        self._titles = {}
+        
+        # Last list_sessions() result and the directory mtime it was built at
+        self._sessions_cache = None
+        self._sessions_cache_mtime = None
     
     def create_new_session(self):
         """
@@ -49,7 +152,11 @@ class HistoryManager:
     
     def save_session(self, session_id, conversation, title=None):
         """
-        Save a chat session to disk
+        Save a chat session to disk.
+        
+        Writes immediately if nothing was saved in the last ``SAVE_DELAY``
+        seconds; otherwise the call is coalesced and written by ``flush()``
+        when the delay expires.  Call ``flush()`` on shutdown.
         
         Args:
             session_id (str): Unique session identifier
@@ -59,46 +166,78 @@ class HistoryManager:
         if not conversation:
             return
         
-        # Generate title from first user query if not provided
+        # Generate title from first user query if not provided; the first
+        # exchange never changes, so derive it once per session
         if not title:
-            title = conversation[0].get('user', 'Untitled Chat')[:100]
+            title = self._titles.get(session_id)
+            if not title:
+                title = conversation[0].get('user', 'Untitled Chat')[:100]
+        self._titles[session_id] = title
         
-        session_data = {
-            'session_id': session_id,
-            'title': title,
-            'timestamp': datetime.now().isoformat(),
-            'conversation': conversation
-        }
+        # Snapshot: the window keeps appending to its list
+        snapshot = list(conversation)
         
-        filepath = os.path.join(self.history_dir, '{}.json'.format(session_id))
+        # Ordered so the listing fields lead the file (see _HEADER_RE)
+        session_data = collections.OrderedDict([
+            ('session_id', session_id),
+            ('title', title),
+            ('timestamp', datetime.now().isoformat()),
+            ('conversation', snapshot),
+        ])
         
-        f = None
-        try:
-            import io
-            # Use io.open for consistent unicode handling in Python 2 (IronPython)
-            f = io.open(filepath, 'w', encoding='utf-8')
-            # ensure_ascii=True forces ascii, which is safest for avoiding codec errors
-            json_str = json.dumps(session_data, indent=2, ensure_ascii=True)
-            f.write(unicode(json_str)) # Write the ascii-escaped unicode string
-        except Exception as e:
-            # Fallback
-            if f:
-                try:
-                    f.close()
-                except:
-                    pass
-                f = None
-            try:
-                f = open(filepath, 'w')
-                json.dump(session_data, f, indent=2, ensure_ascii=True)
-            except:
-                safe_print("Error saving session: {}".format(safe_str(e)))
-        finally:
-            if f:
+        with self._save_lock:
+            self._pending_saves[session_id] = session_data
+            self._sessions_cache_mtime = None
+            if time.time() - self._last_save_ts >= self.SAVE_DELAY:
+                self.flush()
+            elif self._save_timer is None:
+                self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+    
+    def flush(self):
+        """Write any sessions still waiting on the save debounce"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            pending = self._pending_saves
+            self._pending_saves = {}
+            if not pending:
+                return
+            
+            written = False
+            for session_id, session_data in pending.items():
+                # Nothing new since the last write/load (e.g. switching away
+                # from a session that was only viewed) -- skip rewriting it.
+                # Hashed here rather than in save_session() to keep the
+                # serialization off the caller's thread when debounced
+                content = _content_hash(session_data['title'], session_data['conversation'])
+                if content is not None and self._saved_content.get(session_id) == content:
+                    continue
+                self._saved_content[session_id] = content
+                
+                filepath = os.path.join(self.history_dir, '{}.json'.format(session_id))
                 try:
-                    f.close()
-                except:
-                    pass
+                    # Serialized straight to UTF-8 bytes, so no text codec on write
+                    self._atomic_write(filepath, session_data)
+                except _WRITE_ERRORS as e:
+                    safe_print("Error saving session: {}".format(safe_str(e)))
+                    # Let the next save_session() retry the write
+                    self._saved_content.pop(session_id, None)
+                    continue
+                
+                # Keep the listing index in step with the file on disk
+                self._index[session_id] = {
+                    'title': session_data['title'],
+                    'timestamp': session_data['timestamp']
+                }
+                written = True
+            
+            if written:
+                self._write_index()
+                self._last_save_ts = time.time()
+            self._sessions_cache_mtime = None
     
     def load_session(self, session_id):
         """
@@ -110,19 +249,38 @@ class HistoryManager:
         Returns:
             dict: Session data including conversation, or None if not found
         """
-        filepath = os.path.join(self.history_dir, '{}.json'.format(session_id))
+        # A save still inside the debounce window is newer than the file
+        pending = self._pending_saves.get(session_id)
+        if pending is not None:
+            # Copy: the caller appends to the returned conversation, which
+            # must not change the snapshot still waiting to be written
+            data = dict(pending)
+            data['conversation'] = list(pending['conversation'])
+            return data
         
-        if not os.path.exists(filepath):
-            return None
+        data = self._read_session(session_id)
+        if isinstance(data, dict):
+            self._saved_content[session_id] = _content_hash(
+                data.get('title'), data.get('conversation') or []
+            )
+        return data
+    
+    def _read_session(self, session_id):
+        """Read and parse a session file; None if missing or unreadable"""
+        filepath = os.path.join(self.history_dir, '{}.json'.format(session_id))
         
         f = None
         try:
-            # First try reading as utf-8 using io
-            import io
-            f = io.open(filepath, 'r', encoding='utf-8')
-            content = f.read()
-            return json.loads(content)
-        except Exception as e:
+            # Read the raw UTF-8 bytes and let the codec decode them.  No
+            # exists() check first: a missing file is just a failed open
+            try:
+                f = io.open(filepath, 'rb')
+            except _FILE_ERRORS as e:
+                if e.errno == errno.ENOENT:
+                    return None
+                raise
+            return _loads(f.read())
+        except _READ_ERRORS:
             if f:
                 try:
                     f.close()
@@ -134,7 +292,7 @@ class HistoryManager:
                 f = open(filepath, 'r')
                 result = json.load(f)
                 return result
-            except Exception as ex:
+            except _READ_ERRORS as ex:
                 safe_print("Error loading session: {}".format(safe_str(ex)))
                 return None
         finally:
@@ -144,6 +302,37 @@ class HistoryManager:
                 except:
                     pass
     
+    def _read_session_header(self, session_id):
+        """
+        Read session_id/title/timestamp from the first bytes of a session
+        file.  Returns None when the file doesn't start with those keys
+        (older indented files), so the caller can fall back to a full parse.
+        """
+        filepath = os.path.join(self.history_dir, '{}.json'.format(session_id))
+        f = None
+        try:
+            f = io.open(filepath, 'rb')
+            match = _HEADER_RE.match(f.read(_HEADER_BYTES))
+            if match is None:
+                return None
+            # Decode each captured JSON string (escapes and all)
+            session_id_value, title, timestamp = [
+                _loads(b'"' + group + b'"') for group in match.groups()
+            ]
+            return {
+                'session_id': session_id_value,
+                'title': title,
+                'timestamp': timestamp
+            }
+        except _READ_ERRORS:
+            return None
+        finally:
+            if f:
+                try:
+                    f.close()
+                except:
+                    pass
+    
     def list_sessions(self):
         """
         List all available chat sessions, sorted by date (newest first)
@@ -151,41 +340,178 @@ class HistoryManager:
         Returns:
             list: List of dicts with session_id, title, timestamp
         """
-        sessions = []
+        try:
+            dir_mtime = os.path.getmtime(self.history_dir)
+        except OSError:
+            return []
         
-        if not os.path.exists(self.history_dir):
-            return sessions
+        # Nothing was added, removed or renamed since the last listing
+        if self._sessions_cache is not None and dir_mtime == self._sessions_cache_mtime:
+            return list(self._sessions_cache)
         
-        try:
-            for filename in os.listdir(self.history_dir):
-                if filename.endswith('.json'):
-                    filepath = os.path.join(self.history_dir, filename)
-                    f = None
-                    try:
-                        import io
-                        f = io.open(filepath, 'r', encoding='utf-8')
-                        data = json.load(f)
-                        sessions.append({
-                            'session_id': data.get('session_id', filename[:-5]),
-                            'title': data.get('title', 'Untitled Chat'),
-                            'timestamp': data.get('timestamp', '')
-                        })
-                    except:
-                        # Skip corrupted files
-                        continue
-                    finally:
-                        if f:
-                            try:
-                                f.close()
-                            except:
-                                pass
-        except Exception as e:
-            safe_print("Error listing sessions: {}".format(safe_str(e)))
+        # The index and its temp file are shared with flush() on the
+        # debounce timer thread
+        with self._save_lock:
+            self._refresh_index()
+            
+            entries = dict(self._index)
+            # Include saves still waiting on the debounce
+            for session_id, session_data in self._pending_saves.items():
+                entries[session_id] = session_data
+        
+        sessions = [
+            {
+                'session_id': session_id,
+                'title': entry.get('title', 'Untitled Chat'),
+                'timestamp': entry.get('timestamp', '')
+            }
+            for session_id, entry in entries.items()
+        ]
         
         # Sort by timestamp, newest first
         sessions.sort(key=lambda x: x['timestamp'], reverse=True)
         
-        return sessions
+        self._sessions_cache = sessions
+        self._sessions_cache_mtime = dir_mtime
+        
+        return list(sessions)
+    
+    # ------------------------------------------------------------------
+    # Listing index
+    # ------------------------------------------------------------------
+    
+    def _session_files(self):
+        """Return (filename, path) pairs for the session .json files on disk"""
+        scandir = getattr(os, 'scandir', None)
+        if scandir is None:
+            # IronPython 2.7 has no os.scandir
+            return [
+                (filename, os.path.join(self.history_dir, filename))
+                for filename in os.listdir(self.history_dir)
+                if filename.endswith('.json') and filename != _INDEX_FILENAME
+            ]
+        
+        # DirEntry carries the file type and full path from the directory
+        # read, so there is no per-file stat or path join
+        it = scandir(self.history_dir)
+        try:
+            return [
+                (entry.name, entry.path) for entry in it
+                if entry.name.endswith('.json') and entry.name != _INDEX_FILENAME
+                and entry.is_file()
+            ]
+        finally:
+            close = getattr(it, 'close', None)
+            if close is not None:
+                close()
+    
+    def _session_ids_on_disk(self):
+        """Return the set of session ids that have a .json file on disk"""
+        return set(filename[:-5] for filename, _ in self._session_files())
+    
+    def _load_index(self):
+        """Load the listing index, rebuilding it from the session files if needed"""
+        index = None
+        f = None
+        try:
+            self._index_mtime = os.path.getmtime(self._index_path)
+            f = io.open(self._index_path, 'rb')
+            index = _loads(f.read())
+            if not isinstance(index, dict):
+                index = None
+        except _READ_ERRORS:
+            index = None
+        finally:
+            if f:
+                try:
+                    f.close()
+                except:
+                    pass
+        
+        if index is None:
+            self._index = {}
+            self._sync_index()
+            return self._index
+        return index
+    
+    def _refresh_index(self):
+        """
+        Pick up changes made outside this instance (another HistoryManager
+        rewrote the index, or files were added/removed by hand).
+        Callers hold ``_save_lock``.
+        """
+        try:
+            mtime = os.path.getmtime(self._index_path)
+        except OSError:
+            mtime = None
+        if mtime is None or mtime != self._index_mtime:
+            self._index = self._load_index()
+        else:
+            self._sync_index()
+    
+    def _sync_index(self):
+        """Reconcile the index keys with the session files actually on disk"""
+        try:
+            on_disk = self._session_ids_on_disk()
+        except _FILE_ERRORS as e:
+            safe_print("Error listing sessions: {}".format(safe_str(e)))
+            return
+        
+        indexed = set(self._index)
+        if on_disk == indexed:
+            return
+        
+        for session_id in indexed - on_disk:
+            del self._index[session_id]
+        
+        # Only files missing from the index need a full parse
+        for session_id in on_disk - indexed:
+            data = self._read_session_header(session_id) or self._read_session(session_id)
+            if not isinstance(data, dict):
+                # Skip corrupted files
+                continue
+            self._index[session_id] = {
+                'title': data.get('title', 'Untitled Chat'),
+                'timestamp': data.get('timestamp', '')
+            }
+        
+        self._write_index()
+    
+    def _write_index(self):
+        """Rewrite the listing index"""
+        try:
+            self._atomic_write(self._index_path, self._index)
+            self._index_mtime = os.path.getmtime(self._index_path)
+        except _WRITE_ERRORS as e:
+            safe_print("Error saving history index: {}".format(safe_str(e)))
+    
+    @staticmethod
+    def _atomic_write(filepath, obj):
+        """
+        Serialize ``obj`` to a temp file and rename it over ``filepath`` so a
+        crash mid-write never leaves a truncated file.  No fsync: history is
+        not worth a durability barrier on the UI thread.
+        """
+        tmp_path = filepath + '.tmp'
+        f = io.open(tmp_path, 'wb')
+        try:
+            _dump(obj, f)
+            f.close()
+            try:
+                os.replace(tmp_path, filepath)
+            except AttributeError:
+                # IronPython 2.7 lacks os.replace
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                os.rename(tmp_path, filepath)
+        except Exception:
+            # A half-serialized temp file is useless; the live file is untouched
+            f.close()
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
     
     def delete_session(self, session_id):
         """
@@ -199,15 +525,25 @@ class HistoryManager:
         """
         filepath = os.path.join(self.history_dir, '{}.json'.format(session_id))
         
-        if os.path.exists(filepath):
+        # One critical section with flush(), so a flush that already took
+        # the pending snapshot cannot write the file back after removal
+        with self._save_lock:
+            was_pending = self._pending_saves.pop(session_id, None) is not None
+            self._saved_content.pop(session_id, None)
+            self._titles.pop(session_id, None)
+            self._sessions_cache_mtime = None
+            
             try:
                 os.remove(filepath)
-                return True
-            except Exception as e:
+            except _FILE_ERRORS as e:
+                if e.errno == errno.ENOENT:
+                    return was_pending
                 safe_print("Error deleting session: {}".format(safe_str(e)))
                 return False
-        
-        return False
+            
+            if self._index.pop(session_id, None) is not None:
+                self._write_index()
+            return True
     
     def get_history_dir(self):
         """Get the history directory path"""
@@ -220,20 +556,30 @@ class HistoryManager:
         Returns:
             int: Number of sessions deleted
         """
-        count = 0
-        if not os.path.exists(self.history_dir):
-            return 0
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            self._pending_saves = {}
+            self._saved_content = {}
+            self._titles = {}
+            self._sessions_cache_mtime = None
             
-        try:
-            for filename in os.listdir(self.history_dir):
-                if filename.endswith('.json'):
-                    filepath = os.path.join(self.history_dir, filename)
+            count = 0
+            if not os.path.exists(self.history_dir):
+                return 0
+                
+            try:
+                for filename, filepath in self._session_files():
                     try:
                         os.remove(filepath)
+                        self._index.pop(filename[:-5], None)
                         count += 1
-                    except:
+                    except _FILE_ERRORS:
                         continue
-        except Exception as e:
-            safe_print("Error clearing history: {}".format(safe_str(e)))
+            except _FILE_ERRORS as e:
+                safe_print("Error clearing history: {}".format(safe_str(e)))
             
-        return count
+            self._write_index()
+                
+            return count
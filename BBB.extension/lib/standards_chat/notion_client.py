@@ -4,20 +4,60 @@ Notion API Client
 Handles all interactions with Notion API
 """
 
+import re
 import json
+import collections
 import clr
 from standards_chat.utils import safe_str, safe_print
 clr.AddReference('System.Net.Http')
 
 import System
 from System.Net.Http import HttpClient, HttpRequestMessage, HttpMethod
-from System.Net.Http.Headers import MediaTypeWithQualityHeaderValue
+from System.Net.Http.Headers import MediaTypeWithQualityHeaderValue, MediaTypeHeaderValue
 from System.Text import Encoding
 
+try:
+    # Parses the UTF-8 body bytes directly (only where orjson is installed)
+    import orjson
+except ImportError:
+    # IronPython (Revit): let .NET decode the body and use the stdlib codec
+    orjson = None
+
+
+# Everything outside printable ASCII + control chars, i.e. what the old
+# per-character filters dropped (ord >= 127)
+_NON_ASCII_RE = re.compile(u'[^\x00-\x7e]+')
+
+# Block type -> (prefix, suffix) wrapped around its text by _blocks_to_text;
+# the rich text lives under a key named after the block type
+_BLOCK_FORMATS = {
+    'paragraph': ('', ''),
+    'heading_1': ('\n## ', ''),
+    'heading_2': ('\n### ', ''),
+    'heading_3': ('\n#### ', ''),
+    'bulleted_list_item': ('- ', ''),
+    'numbered_list_item': ('- ', ''),
+    'code': ('\n```\n', '\n```'),
+    'quote': ('> ', ''),
+}
+
+# Page properties that may hold the title, in priority order
+_TITLE_KEYS = ('Name', 'Title', 'Standard Name', 'title', 'name')
+
+
+def _read_json(response):
+    """Parse the JSON body of an HttpResponseMessage"""
+    if orjson is not None:
+        return orjson.loads(bytes(response.Content.ReadAsByteArrayAsync().Result))
+    return json.loads(response.Content.ReadAsStringAsync().Result)
+
 
 class NotionClient:
     """Client for interacting with Notion API"""
     
+    # Page bodies kept in memory, keyed by (page_id, last_edited_time)
+    PAGE_CACHE_SIZE = 64
+    
     def __init__(self, config):
         """Initialize Notion client"""
         self.config = config
@@ -26,6 +66,26 @@ class NotionClient:
         self.api_version = config.get('notion', 'api_version')
         self.base_url = "https://api.notion.com/v1"
         
+        # Request URLs and the (constant) database query body, built once
+        self._db_query_url = "{}/databases/{}/query".format(self.base_url, self.database_id)
+        self._search_url = "{}/search".format(self.base_url)
+        self._blocks_url = self.base_url + "/blocks/{}/children"
+        # Encoded to UTF-8 once; each request only wraps the same byte array
+        self._db_query_bytes = Encoding.UTF8.GetBytes(json.dumps({
+            "page_size": 20,
+            "sorts": [
+                {
+                    "timestamp": "last_edited_time",
+                    "direction": "descending"
+                }
+            ]
+        }))
+        # Search results report database ids with or without dashes
+        self._database_id_compact = (self.database_id or '').replace('-', '')
+        
+        # LRU of page text; an edit changes last_edited_time and so the key
+        self._page_cache = collections.OrderedDict()
+        
         # Create HTTP client
         self.client = HttpClient()
         self.client.DefaultRequestHeaders.Add(
@@ -54,61 +114,96 @@ class NotionClient:
         # Query the specific database with text filter
         search_results = self._query_database(query)
         
-        # Process results
+        # Process results.  Page bodies are fetched concurrently, one batch
+        # of max_results at a time; a further batch from the spare candidates
+        # is only started if pages in the previous one failed.
+        candidates = search_results[:max_results * 2]  # Get more results to filter
         relevant_pages = []
-        for result in search_results[:max_results * 2]:  # Get more results to filter
-            try:
-                # Fetch full page content
-                page_content = self._fetch_page_content(result['id'])
-                
-                # Extract metadata
-                page_data = {
-                    'id': result['id'],
-                    'title': self._extract_title(result),
-                    'url': result['url'],
-                    'content': page_content,
-                    'category': self._extract_property(result, 'Category'),
-                    'last_updated': self._extract_property(result, 'Last Updated')
-                }
-                
-                relevant_pages.append(page_data)
-                
-                # Stop if we have enough
-                if len(relevant_pages) >= max_results:
-                    break
+        next_index = 0
+        while len(relevant_pages) < max_results and next_index < len(candidates):
+            batch = candidates[next_index:next_index + (max_results - len(relevant_pages))]
+            next_index += len(batch)
+            
+            # Send every request in the batch before waiting on any of them;
+            # pages unchanged since they were last fetched come from the cache
+            pending = []
+            for result in batch:
+                try:
+                    cache_key = self._page_cache_key(result)
+                    cached = self._get_cached_page(cache_key)
+                    task = self._start_fetch(result['id']) if cached is None else None
+                    pending.append((result, cache_key, task, cached))
+                except Exception as e:
+                    self._log_page_error(result, e)
+            
+            for result, cache_key, task, page_content in pending:
+                try:
+                    # Fetch full page content
+                    if task is not None:
+                        page_content = self._finish_fetch(task)
+                        self._put_cached_page(cache_key, page_content)
                     
-            except Exception as e:
-                # Log error but continue with other pages
-                safe_print(u"Error processing page {}: {}".format(
-                    result.get('id', 'unknown'), 
-                    safe_str(e)
-                ))
-                continue
+                    # Extract metadata
+                    page_data = {
+                        'id': result['id'],
+                        'title': self._extract_title(result),
+                        'url': result['url'],
+                        'content': page_content,
+                        'category': self._extract_property(result, 'Category'),
+                        'last_updated': self._extract_property(result, 'Last Updated')
+                    }
+                    
+                    relevant_pages.append(page_data)
+                    
+                except Exception as e:
+                    # Log error but continue with other pages
+                    self._log_page_error(result, e)
+                    continue
         
         return relevant_pages
     
+    def _page_cache_key(self, result):
+        """Cache key for a search result, or None if it can't be versioned"""
+        edited = result.get('last_edited_time')
+        if not edited:
+            return None
+        return (result['id'], edited)
+    
+    def _get_cached_page(self, key):
+        """Return cached page text for key (refreshing its LRU position) or None"""
+        if key is None:
+            return None
+        text = self._page_cache.pop(key, None)
+        if text is not None:
+            self._page_cache[key] = text
+        return text
+    
+    def _put_cached_page(self, key, text):
+        """Store page text, evicting the least recently used entries"""
+        if key is None:
+            return
+        self._page_cache.pop(key, None)
+        self._page_cache[key] = text
+        while len(self._page_cache) > self.PAGE_CACHE_SIZE:
+            self._page_cache.popitem(last=False)
+    
+    def _log_page_error(self, result, e):
+        """Report a page that could not be fetched or parsed"""
+        safe_print(u"Error processing page {}: {}".format(
+            result.get('id', 'unknown'), 
+            safe_str(e)
+        ))
+    
     def _query_database(self, query):
         """Query the specific standards database"""
         # Try database query first
         try:
-            url = "{}/databases/{}/query".format(self.base_url, self.database_id)
-            
-            payload = {
-                "page_size": 20,
-                "sorts": [
-                    {
-                        "timestamp": "last_edited_time",
-                        "direction": "descending"
-                    }
-                ]
-            }
-            
-            request = HttpRequestMessage(HttpMethod.Post, url)
-            request.Content = System.Net.Http.StringContent(
-                json.dumps(payload),
-                Encoding.UTF8,
-                "application/json"
-            )
+            request = HttpRequestMessage(HttpMethod.Post, self._db_query_url)
+            # HttpClient disposes request content, so the wrapper is per call
+            request.Content = System.Net.Http.ByteArrayContent(self._db_query_bytes)
+            content_type = MediaTypeHeaderValue("application/json")
+            content_type.CharSet = "utf-8"
+            request.Content.Headers.ContentType = content_type
             
             response = self.client.SendAsync(request).Result
             
@@ -119,8 +214,7 @@ class NotionClient:
             
             response.EnsureSuccessStatusCode()
             
-            content = response.Content.ReadAsStringAsync().Result
-            data = json.loads(content)
+            data = _read_json(response)
             all_results = data.get('results', [])
             
         except Exception as e:
@@ -151,8 +245,6 @@ class NotionClient:
     
     def _search_and_filter(self, query):
         """Fallback: use search API and filter by database"""
-        url = "{}/search".format(self.base_url)
-        
         payload = {
             "query": query,
             "filter": {
@@ -162,7 +254,7 @@ class NotionClient:
             "page_size": 20
         }
         
-        request = HttpRequestMessage(HttpMethod.Post, url)
+        request = HttpRequestMessage(HttpMethod.Post, self._search_url)
         request.Content = System.Net.Http.StringContent(
             json.dumps(payload),
             Encoding.UTF8,
@@ -172,8 +264,7 @@ class NotionClient:
         response = self.client.SendAsync(request).Result
         response.EnsureSuccessStatusCode()
         
-        content = response.Content.ReadAsStringAsync().Result
-        data = json.loads(content)
+        data = _read_json(response)
         
         # Filter to only pages from our database
         results = []
@@ -181,22 +272,26 @@ class NotionClient:
             parent = page.get('parent', {})
             if parent.get('type') == 'database_id':
                 db_id = parent.get('database_id', '').replace('-', '')
-                config_db_id = self.database_id.replace('-', '')
-                if db_id == config_db_id:
+                if db_id == self._database_id_compact:
                     results.append(page)
         
         return results
     
     def _fetch_page_content(self, page_id):
         """Fetch full content of a Notion page"""
-        url = "{}/blocks/{}/children".format(self.base_url, page_id)
-        
-        request = HttpRequestMessage(HttpMethod.Get, url)
-        response = self.client.SendAsync(request).Result
+        return self._finish_fetch(self._start_fetch(page_id))
+    
+    def _start_fetch(self, page_id):
+        """Send the block-children request for a page; returns the pending Task"""
+        request = HttpRequestMessage(HttpMethod.Get, self._blocks_url.format(page_id))
+        return self.client.SendAsync(request)
+    
+    def _finish_fetch(self, task):
+        """Wait for a request from _start_fetch and convert the page blocks to text"""
+        response = task.Result
         response.EnsureSuccessStatusCode()
         
-        content = response.Content.ReadAsStringAsync().Result
-        data = json.loads(content)
+        data = _read_json(response)
         
         blocks = data.get('results', [])
         
@@ -211,63 +306,23 @@ class NotionClient:
         
         for block in blocks:
             block_type = block.get('type')
+            fmt = _BLOCK_FORMATS.get(block_type)
+            if fmt is None:
+                continue
             
-            if block_type == 'paragraph':
-                text = self._extract_rich_text(block['paragraph'])
-                if text:
-                    text_parts.append(text)
-            
-            elif block_type == 'heading_1':
-                text = self._extract_rich_text(block['heading_1'])
-                if text:
-                    text_parts.append("\n## {}".format(text))
-            
-            elif block_type == 'heading_2':
-                text = self._extract_rich_text(block['heading_2'])
-                if text:
-                    text_parts.append("\n### {}".format(text))
-            
-            elif block_type == 'heading_3':
-                text = self._extract_rich_text(block['heading_3'])
-                if text:
-                    text_parts.append("\n#### {}".format(text))
-            
-            elif block_type == 'bulleted_list_item':
-                text = self._extract_rich_text(block['bulleted_list_item'])
-                if text:
-                    text_parts.append("- {}".format(text))
-            
-            elif block_type == 'numbered_list_item':
-                text = self._extract_rich_text(block['numbered_list_item'])
-                if text:
-                    text_parts.append("- {}".format(text))
-            
-            elif block_type == 'code':
-                text = self._extract_rich_text(block['code'])
-                if text:
-                    text_parts.append("\n```\n{}\n```".format(text))
-            
-            elif block_type == 'quote':
-                text = self._extract_rich_text(block['quote'])
-                if text:
-                    text_parts.append("> {}".format(text))
+            text = self._extract_rich_text(block[block_type])
+            if text:
+                prefix, suffix = fmt
+                text_parts.append(prefix + text + suffix)
         
         return "\n".join(text_parts)
     
     def _extract_rich_text(self, block_content):
         """Extract plain text from rich text array, filtering out problematic Unicode"""
         rich_text = block_content.get('rich_text', [])
-        text_parts = []
-        for rt in rich_text:
-            plain_text = rt.get('plain_text', '')
-            # Filter out characters that can't be encoded in IronPython
-            # Keep printable ASCII and common whitespace/punctuation
-            filtered_text = ''.join(
-                char for char in plain_text 
-                if ord(char) < 127 or (127 <= ord(char) < 0xFFFF and char in '\n\r\t ')
-            )
-            text_parts.append(filtered_text)
-        return ''.join(text_parts)
+        # Filter out characters that can't be encoded in IronPython.  The
+        # filter is per character, so join the runs first and scan once
+        return _NON_ASCII_RE.sub(u'', u''.join([rt.get('plain_text', '') for rt in rich_text]))
     
     def _is_standards_page(self, page):
         """Check if page belongs to standards database"""
@@ -282,21 +337,19 @@ class NotionClient:
         properties = page.get('properties', {})
         
         # Try common title property names
-        for key in ['Name', 'Title', 'Standard Name', 'title', 'name']:
-            if key in properties:
-                prop = properties[key]
-                prop_type = prop.get('type', '')
-                
-                if prop_type == 'title':
-                    title_array = prop.get('title', [])
-                    if title_array and len(title_array) > 0:
-                        title = title_array[0].get('plain_text', '')
-                        return self._clean_unicode(title)
-                elif prop_type == 'rich_text':
-                    rich_text_array = prop.get('rich_text', [])
-                    if rich_text_array and len(rich_text_array) > 0:
-                        title = rich_text_array[0].get('plain_text', '')
-                        return self._clean_unicode(title)
+        for key in _TITLE_KEYS:
+            prop = properties.get(key)
+            if not prop:
+                continue
+            
+            # 'title' and 'rich_text' properties store the text array under
+            # a key of the same name as the type
+            prop_type = prop.get('type', '')
+            if prop_type == 'title' or prop_type == 'rich_text':
+                text_array = prop.get(prop_type)
+                if text_array:
+                    title = text_array[0].get('plain_text', '')
+                    return self._clean_unicode(title)
         
         # Fallback to ID if no title found
         return page.get('id', 'Untitled')
@@ -306,10 +359,7 @@ class NotionClient:
         if not text:
             return text
         # Keep only ASCII printable chars and common whitespace
-        return ''.join(
-            char for char in text 
-            if ord(char) < 127 or (127 <= ord(char) < 0xFFFF and char in '\n\r\t ')
-        )
+        return _NON_ASCII_RE.sub(u'', text)
     
     def _extract_property(self, page, prop_name):
         """Extract property value from page"""
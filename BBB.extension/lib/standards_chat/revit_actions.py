@@ -8,13 +8,47 @@ try:
     from Autodesk.Revit.DB import *
     from Autodesk.Revit.UI import *
     from pyrevit import revit, DB, forms
+    from System.Collections.Generic import List
     REVIT_AVAILABLE = True
 except ImportError:
     REVIT_AVAILABLE = False
 
 import json
 import re
-import re
+import threading
+import traceback
+
+# {{variable}} placeholders in workflow step params
+_VAR_RE = re.compile(r'\{\{(\w+)\}\}')
+
+# ```json {...} ``` action blocks in assistant responses
+_JSON_BLOCK_RE = re.compile(r'```json\s*(\{.*?\})\s*```', re.DOTALL)
+
+# Example check: workset names should start with a discipline prefix
+_VALID_WS_PREFIXES = ('A-', 'S-', 'MEP-', 'C-')
+
+# Map common categories to BBB workset conventions
+_WORKSET_MAPPING = {
+    'Doors': 'A-DOOR',
+    'Windows': 'A-GLAZ',
+    'Walls': 'A-WALL',
+    'Floors': 'A-FLOR',
+    'Roofs': 'A-ROOF',
+    'Ceilings': 'A-CLNG',
+    'Stairs': 'A-STRS',
+    'Railings': 'A-RAIL',
+    'Furniture': 'A-FURN',
+    'Casework': 'A-CASE',
+    'Plumbing Fixtures': 'P-PLBG-FIXT',
+    'Mechanical Equipment': 'M-HVAC-EQUP',
+    'Lighting Fixtures': 'E-LITE',
+    'Electrical Equipment': 'E-ELEC-EQUP',
+    'Structural Columns': 'S-COLS',
+    'Structural Framing': 'S-FRAM',
+    'Generic Models': 'A-MODL',
+    'Rooms': 'A-AREA-ROOM',
+    'Areas': 'A-AREA'
+}
 
 
 class ActionEventHandler(IExternalEventHandler):
@@ -22,21 +56,31 @@ class ActionEventHandler(IExternalEventHandler):
     
     def __init__(self):
         self.action_data = None
+        # True when action_data is a list of workflow steps
+        self.is_workflow = False
         self.result = None
         self.executor = None
         self.callback = None
+        # Signalled once Execute() has stored a result, so waiting callers
+        # wake immediately instead of polling
+        self.done = threading.Event()
     
     def Execute(self, uiapp):
         """Execute the action in Revit's API context"""
         try:
-            if self.executor and self.action_data:
-                self.result = self.executor._execute_action_internal(self.action_data)
-            else:
-                self.result = {'success': False, 'message': 'No action data'}
-        except Exception as e:
-            import traceback
-            error_msg = 'Error: {}\n{}'.format(str(e), traceback.format_exc())
-            self.result = {'success': False, 'message': error_msg}
+            try:
+                if self.executor and self.action_data:
+                    if self.is_workflow:
+                        self.result = self.executor._execute_workflow_internal(self.action_data)
+                    else:
+                        self.result = self.executor._execute_action_internal(self.action_data)
+                else:
+                    self.result = {'success': False, 'message': 'No action data'}
+            except Exception as e:
+                error_msg = 'Error: {}\n{}'.format(str(e), traceback.format_exc())
+                self.result = {'success': False, 'message': error_msg}
+        finally:
+            self.done.set()
         
         # Call callback if provided
         if self.callback:
@@ -49,6 +93,24 @@ class ActionEventHandler(IExternalEventHandler):
         return "ChatActionEventHandler"
 
 
+class _SubTransaction(object):
+    """Sub-transaction for one workflow step; rolls back if the step raises"""
+    
+    def __init__(self, doc):
+        self._sub = SubTransaction(doc)
+    
+    def __enter__(self):
+        self._sub.Start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self._sub.Commit()
+        else:
+            self._sub.RollBack()
+        return False
+
+
 class RevitActionExecutor:
     """Execute actions in Revit based on chatbot suggestions"""
     
@@ -60,6 +122,54 @@ class RevitActionExecutor:
         self.event_handler = ActionEventHandler()
         self.event_handler.executor = self
         self.external_event = ExternalEvent.Create(self.event_handler)
+        
+        # Name lookups built lazily on first use (see _get_category and
+        # _get_workset_id) so repeated actions skip the interop scans
+        self._category_by_name = None
+        self._workset_ids_by_name = None
+        
+        # True while _execute_workflow_internal holds the workflow transaction
+        self._in_workflow_tx = False
+        
+        # Action type -> handler, looked up once per action instead of
+        # walking an if/elif chain
+        self._action_dispatch = {
+            'select_elements': self._select_elements,
+            'deselect_all': self._deselect_all,
+            'determine_workset': self._determine_workset,
+            'update_parameters': self._update_parameters,
+            'apply_view_template': self._apply_view_template,
+            'change_workset': self._change_workset,
+            'create_workset': self._create_workset,
+            'isolate_elements': self._isolate_elements,
+            'check_standards': self._check_standards,
+        }
+    
+    def _get_category(self, name):
+        """Return the document Category with the given name, or None"""
+        if self._category_by_name is None:
+            self._category_by_name = dict(
+                (cat.Name, cat) for cat in self.doc.Settings.Categories
+            )
+        return self._category_by_name.get(name)
+    
+    def _get_workset_id(self, name):
+        """Return the WorksetId of the user workset with the given name, or None"""
+        workset_table = self.doc.GetWorksetTable()
+        
+        if self._workset_ids_by_name is not None:
+            workset_id = self._workset_ids_by_name.get(name)
+            # Trust the cache only if the workset still carries that name
+            # (worksets can be renamed or added through sync with central)
+            if workset_id is not None and workset_table.GetWorkset(workset_id).Name == name:
+                return workset_id
+        
+        collector = FilteredWorksetCollector(self.doc)
+        collector.OfKind(WorksetKind.UserWorkset)
+        self._workset_ids_by_name = dict(
+            (workset.Name, workset.Id) for workset in collector
+        )
+        return self._workset_ids_by_name.get(name)
     
     def execute_action(self, action_data, callback=None):
         """
@@ -77,27 +187,33 @@ class RevitActionExecutor:
         if isinstance(action_data, list):
             return self.execute_workflow(action_data, callback)
         
+        # Don't overwrite a request Revit has not run yet
+        if self.external_event.IsPending:
+            return self._request_failed('Another action is still pending', callback)
+        
         # Store action data and callback in handler
         self.event_handler.action_data = action_data
+        self.event_handler.is_workflow = False
         self.event_handler.result = None
         self.event_handler.callback = callback
+        self.event_handler.done.clear()
         
         # Raise the external event to execute in Revit API context
         status = self.external_event.Raise()
+        if status != ExternalEventRequest.Accepted:
+            return self._request_failed(
+                'Revit did not accept the action ({})'.format(status), callback
+            )
         
         # If callback provided, return immediately
         if callback:
             return None
         
-        # Otherwise wait for result (with timeout)
-        import time
+        # Otherwise block until the handler signals completion (with timeout)
         timeout = 10  # seconds
-        elapsed = 0
-        while self.event_handler.result is None and elapsed < timeout:
-            time.sleep(0.1)
-            elapsed += 0.1
+        completed = self.event_handler.done.wait(timeout)
         
-        if self.event_handler.result is None:
+        if not completed:
             return {
                 'success': False,
                 'message': 'Action timed out'
@@ -116,32 +232,33 @@ class RevitActionExecutor:
         Returns:
             dict: Result with success status and details of each step
         """
-        # Package workflow as special action type to execute in single ExternalEvent
-        workflow_action = {
-            'type': 'workflow',
-            'workflow': actions
-        }
-        
-        # Execute through normal action execution (single ExternalEvent)
-        self.event_handler.action_data = workflow_action
+        # Don't overwrite a request Revit has not run yet
+        if self.external_event.IsPending:
+            return self._request_failed('Another action is still pending', callback)
+        
+        # Hand the step list straight to the handler; Execute() runs the
+        # whole workflow inside a single ExternalEvent
+        self.event_handler.action_data = actions
+        self.event_handler.is_workflow = True
         self.event_handler.result = None
         self.event_handler.callback = callback
+        self.event_handler.done.clear()
         
         status = self.external_event.Raise()
+        if status != ExternalEventRequest.Accepted:
+            return self._request_failed(
+                'Revit did not accept the workflow ({})'.format(status), callback
+            )
         
         # If callback provided, return immediately
         if callback:
             return None
         
-        # Otherwise wait for result (with timeout)
-        import time
+        # Otherwise block until the handler signals completion (with timeout)
         timeout = 30  # Longer timeout for workflows
-        elapsed = 0
-        while self.event_handler.result is None and elapsed < timeout:
-            time.sleep(0.1)
-            elapsed += 0.1
+        completed = self.event_handler.done.wait(timeout)
         
-        if self.event_handler.result is None:
+        if not completed:
             return {
                 'success': False,
                 'message': 'Workflow timed out'
@@ -149,11 +266,51 @@ class RevitActionExecutor:
         
         return self.event_handler.result
     
+    def _request_failed(self, message, callback):
+        """
+        Report a request that never reached Revit -- through the callback
+        when one was given (so the UI is not left waiting), otherwise as
+        the return value
+        """
+        result = {'success': False, 'message': message}
+        if callback:
+            try:
+                callback(result)
+            except:
+                pass
+            return None
+        return result
+    
     def _execute_workflow_internal(self, actions):
         """
         Execute workflow actions internally (within ExternalEvent context)
         This runs all steps in sequence within a single Revit API transaction context
         """
+        # One transaction for the whole workflow: steps open sub-transactions
+        # (see _tx) instead of committing and regenerating one by one, and
+        # the workflow undoes as a single operation
+        if self._in_workflow_tx or self.doc.IsReadOnly:
+            results = self._run_workflow_steps(actions)
+        else:
+            with revit.Transaction('Kodama Workflow'):
+                self._in_workflow_tx = True
+                try:
+                    results = self._run_workflow_steps(actions)
+                finally:
+                    self._in_workflow_tx = False
+        
+        # Prepare final result
+        return {
+            'success': all(r['success'] for r in results),
+            'message': 'Completed {} of {} actions'.format(
+                sum(1 for r in results if r['success']), 
+                len(results)
+            ),
+            'steps': results
+        }
+    
+    def _run_workflow_steps(self, actions):
+        """Run workflow steps in order and return the list of step results"""
         results = []
         workflow_context = {}  # Share data between actions
         
@@ -182,15 +339,16 @@ class RevitActionExecutor:
             if not result['success'] and not action_data.get('continue_on_error', False):
                 break
         
-        # Prepare final result
-        return {
-            'success': all(r['success'] for r in results),
-            'message': 'Completed {} of {} actions'.format(
-                sum(1 for r in results if r['success']), 
-                len(results)
-            ),
-            'steps': results
-        }
+        return results
+    
+    def _tx(self, name):
+        """
+        Transaction context for a model-changing action: a standalone
+        transaction normally, a sub-transaction inside a workflow transaction
+        """
+        if self._in_workflow_tx:
+            return _SubTransaction(self.doc)
+        return revit.Transaction(name)
     
     def _substitute_workflow_variables(self, action_data, context):
         """
@@ -203,19 +361,32 @@ class RevitActionExecutor:
         Returns:
             dict: Action data with variables substituted
         """
-        import copy
-        action_data = copy.deepcopy(action_data)
+        params = action_data.get('params')
+        
+        # Most steps have no placeholders -- return them untouched, no copy
+        if not params or not any(
+            isinstance(value, str) and '{{' in value for value in params.values()
+        ):
+            return action_data
+        
+        # Only param values are replaced (and they are scalars), so copying
+        # the step and its params dict is enough to leave the original intact
+        action_data = dict(action_data)
+        action_data['params'] = dict(params)
         
         # Substitute in params
-        if 'params' in action_data:
-            for key, value in action_data['params'].items():
-                if isinstance(value, str) and '{{' in value and '}}' in value:
-                    # Extract variable name
-                    var_match = re.search(r'\{\{(\w+)\}\}', value)
-                    if var_match:
-                        var_name = var_match.group(1)
-                        if var_name in context:
-                            action_data['params'][key] = context[var_name]
+        for key, value in params.items():
+            if isinstance(value, str) and '{{' in value:
+                var_match = _VAR_RE.match(value)
+                if var_match and var_match.end() == len(value):
+                    # Whole value is one placeholder: keep the context value's type
+                    var_name = var_match.group(1)
+                    if var_name in context:
+                        action_data['params'][key] = context[var_name]
+                else:
+                    action_data['params'][key] = _VAR_RE.sub(
+                        lambda m: str(context.get(m.group(1), m.group(0))), value
+                    )
         
         return action_data
     
@@ -228,42 +399,18 @@ class RevitActionExecutor:
         params = action_data.get('params', {})
         
         try:
-            # Handle workflow execution
+            # Nested workflow step (e.g. a parsed {'type': 'workflow'} action)
             if action_type == 'workflow':
                 return self._execute_workflow_internal(action_data.get('workflow', []))
             
-            elif action_type == 'select_elements':
-                return self._select_elements(params)
-            
-            elif action_type == 'deselect_all':
-                return self._deselect_all(params)
-            
-            elif action_type == 'determine_workset':
-                return self._determine_workset(params)
-            
-            elif action_type == 'update_parameters':
-                return self._update_parameters(params)
-            
-            elif action_type == 'apply_view_template':
-                return self._apply_view_template(params)
-            
-            elif action_type == 'change_workset':
-                return self._change_workset(params)
-            
-            elif action_type == 'create_workset':
-                return self._create_workset(params)
+            handler = self._action_dispatch.get(action_type)
+            if handler is not None:
+                return handler(params)
             
-            elif action_type == 'isolate_elements':
-                return self._isolate_elements(params)
-            
-            elif action_type == 'check_standards':
-                return self._check_standards(params)
-            
-            else:
-                return {
-                    'success': False,
-                    'message': 'Unknown action type: {}'.format(action_type)
-                }
+            return {
+                'success': False,
+                'message': 'Unknown action type: {}'.format(action_type)
+            }
                 
         except Exception as e:
             return {
@@ -279,75 +426,87 @@ class RevitActionExecutor:
         
         # Build filter
         elements = []
+        element_ids = None
         
         if category_name:
             # Get category
-            category = None
-            for cat in self.doc.Settings.Categories:
-                if cat.Name == category_name:
-                    category = cat
-                    break
+            category = self._get_category(category_name)
             
             if category:
                 collector = FilteredElementCollector(self.doc) \
                     .OfCategoryId(category.Id) \
                     .WhereElementIsNotElementType()
                 
-                elements = list(collector)
-        
-        # Filter by parameter if specified
+                # Let Revit apply the parameter filter natively when it can
+                if param_filter:
+                    native_filter, exact = self._build_parameter_filter(category, param_filter)
+                    if native_filter is not None:
+                        collector = collector.WherePasses(native_filter)
+                        if exact:
+                            param_filter = None
+                
+                # Filter by workset if specified: resolve the WorksetId once
+                # and let the collector match it natively
+                if workset_name and self.doc.IsWorkshared:
+                    target_ws_id = self._get_workset_id(workset_name)
+                    if target_ws_id is None:
+                        collector = None
+                    else:
+                        collector = collector.WherePasses(
+                            ElementWorksetFilter(target_ws_id)
+                        )
+                
+                if collector is None:
+                    pass
+                elif param_filter:
+                    # Python-side parameter filter still needed below; it
+                    # iterates the collector directly, no intermediate list
+                    elements = collector
+                else:
+                    # Fully filtered natively: hand Revit its own id collection
+                    element_ids = collector.ToElementIds()
+        
+        # Filter by parameter if specified (fallback when not applied natively)
         if param_filter and elements:
             param_name = param_filter.get('name')
             param_value = param_filter.get('value')
             condition = param_filter.get('condition', 'equals')
             
-            filtered = []
-            for elem in elements:
-                param = elem.LookupParameter(param_name)
-                
-                # Handle different conditions
-                if condition == 'is_empty':
-                    # Check if parameter is empty/missing
-                    if not param or not param.HasValue or not param.AsString():
-                        filtered.append(elem)
-                elif condition == 'equals':
-                    # Check if parameter equals value
-                    if param and param.HasValue:
-                        if str(param.AsValueString()) == str(param_value):
-                            filtered.append(elem)
-                elif condition == 'contains':
-                    # Check if parameter contains value
-                    if param and param.HasValue:
-                        param_str = str(param.AsString() or param.AsValueString() or '')
-                        if param_value.lower() in param_str.lower():
-                            filtered.append(elem)
+            # Look each element's parameter up once, lazily
+            pairs = ((elem, elem.LookupParameter(param_name)) for elem in elements)
             
-            elements = filtered
+            # Handle different conditions
+            if condition == 'is_empty':
+                # Check if parameter is empty/missing
+                elements = [e for e, p in pairs
+                            if not p or not p.HasValue or not p.AsString()]
+            elif condition == 'equals':
+                # Check if parameter equals value
+                target = str(param_value)
+                elements = [e for e, p in pairs
+                            if p and p.HasValue and str(p.AsValueString()) == target]
+            elif condition == 'contains':
+                # Check if parameter contains value
+                needle = param_value.lower()
+                elements = [e for e, p in pairs
+                            if p and p.HasValue and
+                            needle in str(p.AsString() or p.AsValueString() or '').lower()]
+            else:
+                elements = []
         
-        # Filter by workset if specified
-        if workset_name and self.doc.IsWorkshared and elements:
-            filtered = []
+        if element_ids is None and elements:
+            element_ids = List[ElementId](len(elements))
             for elem in elements:
-                workset_id = elem.WorksetId
-                if workset_id != WorksetId.InvalidWorksetId:
-                    workset = self.doc.GetWorksetTable().GetWorkset(workset_id)
-                    if workset.Name == workset_name:
-                        filtered.append(elem)
-            
-            elements = filtered
+                element_ids.Add(elem.Id)
         
         # Select the elements
-        if elements:
-            import System.Collections.Generic
-            element_ids = [elem.Id for elem in elements]
-            self.uidoc.Selection.SetElementIds(
-                System.Collections.Generic.List[ElementId](element_ids)
-            )
+        if element_ids is not None and element_ids.Count:
+            self.uidoc.Selection.SetElementIds(element_ids)
             
             return {
                 'success': True,
-                'message': 'Selected {} elements'.format(len(elements)),
-                'count': len(elements)
+                'message': 'Selected {} elements'.format(element_ids.Count),
+                'count': element_ids.Count
             }
         else:
             return {
@@ -355,11 +514,64 @@ class RevitActionExecutor:
                 'message': 'No elements found matching criteria'
             }
     
+    def _build_parameter_filter(self, category, param_filter):
+        """
+        Build an ElementParameterFilter for an 'equals'/'contains' filter on a
+        text parameter, so the collector evaluates it in native code.
+        
+        Returns (filter, exact). filter is None when it cannot be expressed
+        natively (other conditions, non-text parameters, parameter not found
+        on a sample element); the caller then filters in Python. exact is
+        False when the native filter only narrows the candidates and the
+        Python filter must still run on them.
+        """
+        param_name = param_filter.get('name')
+        param_value = param_filter.get('value')
+        condition = param_filter.get('condition', 'equals')
+        
+        if condition == 'equals':
+            evaluator = FilterStringEquals()
+        elif condition == 'contains':
+            evaluator = FilterStringContains()
+        else:
+            return None, False
+        
+        if not param_name or not isinstance(param_value, str) or not param_value:
+            return None, False
+        
+        # Resolve the parameter id (built-in or shared/project) from one element
+        sample = FilteredElementCollector(self.doc) \
+            .OfCategoryId(category.Id) \
+            .WhereElementIsNotElementType() \
+            .FirstElement()
+        if sample is None:
+            return None, False
+        
+        param = sample.LookupParameter(param_name)
+        if not param or param.StorageType != StorageType.String:
+            return None, False
+        
+        provider = ParameterValueProvider(param.Id)
+        exact = True
+        try:
+            # Revit 2022 and earlier: explicit case sensitivity ('equals' was
+            # case-sensitive, 'contains' case-insensitive)
+            rule = FilterStringRule(
+                provider, evaluator, param_value, condition == 'equals'
+            )
+        except Exception:
+            # Revit 2023+: the case-sensitivity overload was removed and the
+            # rule is case-insensitive, so 'equals' keeps the exact-case
+            # Python check to select the same elements on every version
+            rule = FilterStringRule(provider, evaluator, param_value)
+            exact = condition != 'equals'
+        
+        return ElementParameterFilter(rule), exact
+    
     def _deselect_all(self, params):
         """Deselect all elements"""
         try:
-            import System.Collections.Generic
-            empty_list = System.Collections.Generic.List[ElementId]()
+            empty_list = List[ElementId]()
             self.uidoc.Selection.SetElementIds(empty_list)
             
             return {
@@ -386,7 +598,8 @@ class RevitActionExecutor:
             }
         
         # Get first selected element
-        first_elem = self.doc.GetElement(list(selection)[0])
+        first_id = next(iter(selection))
+        first_elem = self.doc.GetElement(first_id)
         
         if not first_elem:
             return {
@@ -404,41 +617,12 @@ class RevitActionExecutor:
         
         category_name = category.Name
         
-        # Map common categories to BBB workset conventions
-        workset_mapping = {
-            'Doors': 'A-DOOR',
-            'Windows': 'A-GLAZ',
-            'Walls': 'A-WALL',
-            'Floors': 'A-FLOR',
-            'Roofs': 'A-ROOF',
-            'Ceilings': 'A-CLNG',
-            'Stairs': 'A-STRS',
-            'Railings': 'A-RAIL',
-            'Furniture': 'A-FURN',
-            'Casework': 'A-CASE',
-            'Plumbing Fixtures': 'P-PLBG-FIXT',
-            'Mechanical Equipment': 'M-HVAC-EQUP',
-            'Lighting Fixtures': 'E-LITE',
-            'Electrical Equipment': 'E-ELEC-EQUP',
-            'Structural Columns': 'S-COLS',
-            'Structural Framing': 'S-FRAM',
-            'Generic Models': 'A-MODL',
-            'Rooms': 'A-AREA-ROOM',
-            'Areas': 'A-AREA'
-        }
-        
-        recommended_workset = workset_mapping.get(category_name, 'A-MODL')
+        recommended_workset = _WORKSET_MAPPING.get(category_name, 'A-MODL')
         
         # Check if workset exists
         workset_exists = False
         if self.doc.IsWorkshared:
-            collector = FilteredWorksetCollector(self.doc)
-            collector.OfKind(WorksetKind.UserWorkset)
-            
-            for workset in collector:
-                if workset.Name == recommended_workset:
-                    workset_exists = True
-                    break
+            workset_exists = self._get_workset_id(recommended_workset) is not None
         
         return {
             'success': True,
@@ -464,28 +648,48 @@ class RevitActionExecutor:
                 'message': 'No elements selected'
             }
         
+        # Storage type -> converter; the converted value is computed once per
+        # storage type rather than per element
+        converters = {
+            StorageType.String: str,
+            StorageType.Integer: int,
+            StorageType.Double: float,
+        }
+        values = {}
+        
+        # Built-in parameter, once known, so later elements use the direct
+        # get_Parameter() lookup instead of LookupParameter's name search
+        bip = None
+        
         # Use pyRevit transaction context
         try:
-            with revit.Transaction('Update Parameters'):
+            with self._tx('Update Parameters'):
                 updated_count = 0
                 
                 for elem_id in selection:
                     elem = self.doc.GetElement(elem_id)
-                    param = elem.LookupParameter(param_name)
+                    param = elem.get_Parameter(bip) if bip is not None else None
+                    if param is None:
+                        # Not every category exposes the built-in parameter;
+                        # a shared/project parameter may carry the same name
+                        param = elem.LookupParameter(param_name)
+                        if param and bip is None:
+                            definition = param.Definition
+                            if isinstance(definition, InternalDefinition) and \
+                                    definition.BuiltInParameter != BuiltInParameter.INVALID:
+                                bip = definition.BuiltInParameter
                     
                     if param and not param.IsReadOnly:
                         # Set value based on storage type
                         storage_type = param.StorageType
+                        if storage_type not in values:
+                            convert = converters.get(storage_type)
+                            if convert is None:
+                                continue
+                            values[storage_type] = convert(param_value)
                         
-                        if storage_type == StorageType.String:
-                            param.Set(str(param_value))
-                            updated_count += 1
-                        elif storage_type == StorageType.Integer:
-                            param.Set(int(param_value))
-                            updated_count += 1
-                        elif storage_type == StorageType.Double:
-                            param.Set(float(param_value))
-                            updated_count += 1
+                        param.Set(values[storage_type])
+                        updated_count += 1
                 
                 return {
                     'success': True,
@@ -525,19 +729,11 @@ class RevitActionExecutor:
                 'message': 'No elements selected'
             }
         
-        # Find workset by iterating through workset IDs
-        workset_table = self.doc.GetWorksetTable()
+        # Find workset by name; fetch it fresh so IsEditable is current
         target_workset = None
-        
-        # Get all user worksets
-        collector = FilteredWorksetCollector(self.doc)
-        collector.OfKind(WorksetKind.UserWorkset)
-        
-        for workset_id in collector.ToWorksetIds():
-            workset = workset_table.GetWorkset(workset_id)
-            if workset.Name == workset_name:
-                target_workset = workset
-                break
+        workset_id = self._get_workset_id(workset_name)
+        if workset_id is not None:
+            target_workset = self.doc.GetWorksetTable().GetWorkset(workset_id)
         
         if not target_workset:
             return {
@@ -554,20 +750,23 @@ class RevitActionExecutor:
         
         # Use pyRevit transaction context
         try:
-            with revit.Transaction('Change Workset'):
+            with self._tx('Change Workset'):
                 changed_count = 0
                 
+                # Loop invariants, resolved once rather than per element
+                partition_bip = BuiltInParameter.ELEM_PARTITION_PARAM
+                target_ws_int = target_workset.Id.IntegerValue
+                get_element = self.doc.GetElement
+                
                 for elem_id in selection:
-                    elem = self.doc.GetElement(elem_id)
+                    elem = get_element(elem_id)
                     
                     # Check if element can be assigned to workset
                     if hasattr(elem, 'WorksetId'):
-                        workset_param = elem.get_Parameter(
-                            BuiltInParameter.ELEM_PARTITION_PARAM
-                        )
+                        workset_param = elem.get_Parameter(partition_bip)
                         
                         if workset_param and not workset_param.IsReadOnly:
-                            workset_param.Set(target_workset.Id.IntegerValue)
+                            workset_param.Set(target_ws_int)
                             changed_count += 1
                 
                 return {
@@ -603,21 +802,20 @@ class RevitActionExecutor:
             }
         
         # Check if workset already exists
-        collector = FilteredWorksetCollector(self.doc)
-        collector.OfKind(WorksetKind.UserWorkset)
-        
-        for workset in collector:
-            if workset.Name == workset_name:
-                return {
-                    'success': False,
-                    'message': 'Workset "{}" already exists'.format(workset_name)
-                }
+        if self._get_workset_id(workset_name) is not None:
+            return {
+                'success': False,
+                'message': 'Workset "{}" already exists'.format(workset_name)
+            }
         
         # Create the workset
         try:
-            with revit.Transaction('Create Workset'):
+            with self._tx('Create Workset'):
                 new_workset = Workset.Create(self.doc, workset_name)
                 
+                # Rebuild the name lookup on next use
+                self._workset_ids_by_name = None
+                
                 return {
                     'success': True,
                     'message': 'Created workset "{}"'.format(workset_name)
@@ -660,7 +858,7 @@ class RevitActionExecutor:
         
         # Apply template
         try:
-            with revit.Transaction('Apply View Template'):
+            with self._tx('Apply View Template'):
                 active_view.ViewTemplateId = target_template.Id
                 
                 return {
@@ -689,7 +887,7 @@ class RevitActionExecutor:
         active_view = self.doc.ActiveView
         
         try:
-            with revit.Transaction('Isolate Elements'):
+            with self._tx('Isolate Elements'):
                 active_view.IsolateElementsTemporary(selection)
                 
                 return {
@@ -718,25 +916,34 @@ class RevitActionExecutor:
         
         issues = []
         
+        # User workset names keyed by id, fetched once for the whole selection
+        check_worksets = check_type in ['all', 'workset'] and self.doc.IsWorkshared
+        if check_worksets:
+            workset_table = self.doc.GetWorksetTable()
+            collector = FilteredWorksetCollector(self.doc)
+            collector.OfKind(WorksetKind.UserWorkset)
+            ws_map = dict((w.Id.IntegerValue, w.Name) for w in collector)
+        
         for elem_id in selection:
             elem = self.doc.GetElement(elem_id)
             
             # Check workset naming
-            if check_type in ['all', 'workset']:
-                if self.doc.IsWorkshared:
-                    workset_id = elem.WorksetId
-                    if workset_id != WorksetId.InvalidWorksetId:
-                        workset = self.doc.GetWorksetTable().GetWorkset(workset_id)
-                        
-                        # Example check: Workset should start with discipline
-                        valid_prefixes = ['A-', 'S-', 'MEP-', 'C-']
-                        if not any(workset.Name.startswith(p) for p in valid_prefixes):
-                            issues.append({
-                                'element_id': elem_id.IntegerValue,
-                                'category': elem.Category.Name if elem.Category else 'Unknown',
-                                'issue': 'Invalid workset name: {}'.format(workset.Name),
-                                'workset': workset.Name
-                            })
+            if check_worksets:
+                workset_id = elem.WorksetId
+                if workset_id != WorksetId.InvalidWorksetId:
+                    ws_name = ws_map.get(workset_id.IntegerValue)
+                    if ws_name is None:
+                        # View/family/standard worksets are not in the map
+                        ws_name = workset_table.GetWorkset(workset_id).Name
+                        ws_map[workset_id.IntegerValue] = ws_name
+                    
+                    if not ws_name.startswith(_VALID_WS_PREFIXES):
+                        issues.append({
+                            'element_id': elem_id.IntegerValue,
+                            'category': elem.Category.Name if elem.Category else 'Unknown',
+                            'issue': 'Invalid workset name: {}'.format(ws_name),
+                            'workset': ws_name
+                        })
             
             # Check for required parameters
             if check_type in ['all', 'parameters']:
@@ -772,12 +979,14 @@ def parse_action_from_response(response_text):
     """
     actions = []
     
-    # Look for JSON code blocks in response
-    json_blocks = re.findall(r'```json\s*(\{.*?\})\s*```', response_text, re.DOTALL)
+    # Most responses carry no action blocks -- skip the regex entirely
+    if '```json' not in response_text:
+        return actions
     
-    for json_str in json_blocks:
+    # Look for JSON code blocks in response
+    for match in _JSON_BLOCK_RE.finditer(response_text):
         try:
-            action_data = json.loads(json_str)
+            action_data = json.loads(match.group(1))
             
             # Check for single action
             if 'action' in action_data:
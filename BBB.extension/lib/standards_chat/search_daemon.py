@@ -22,6 +22,8 @@ Communication
 -------------
 POST /search   body: {"query": "...", "n_results": 10, "deduplicate": true}
                resp: {"success": true, "results": [...]}
+POST /search   body: {"queries": ["...", ...], "n_results": 10, "deduplicate": true}
+               resp: {"success": true, "results_per_query": [[...], ...]}
 
 POST /shutdown  â†’ graceful shutdown (used by interop client on Revit exit)
 GET  /ping      â†’ {"ok": true}  (readiness probe)
@@ -35,6 +37,8 @@ import threading
 import socket
 import traceback
 import signal
+import zlib
+from collections import OrderedDict
 
 # ---------------------------------------------------------------------------
 # Path setup â€“ support being called directly from disk
@@ -44,21 +48,49 @@ _lib_path = os.path.dirname(_script_dir)
 if _lib_path not in sys.path:
     sys.path.insert(0, _lib_path)
 
+# Managed packages directory (numpy etc.) â€“ pyRevit's CPython leaves
+# site-packages off sys.path; same location search_vector_db.py uses
+_packages_dir = os.path.join(
+    os.environ.get('LOCALAPPDATA', os.path.expanduser('~')),
+    'BBB', 'Kodama', 'packages'
+)
+if os.path.isdir(_packages_dir) and _packages_dir not in sys.path:
+    sys.path.insert(0, _packages_dir)
+
+# ---------------------------------------------------------------------------
+# JSON codec â€“ orjson when installed, stdlib otherwise
+# ---------------------------------------------------------------------------
+try:
+    import orjson
+
+    def _dumps(obj):
+        # Native encoder, emits UTF-8 bytes directly; orjson is stricter
+        # than json (e.g. non-str keys), so fall back rather than fail
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def _loads(data):
+        return orjson.loads(data)
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def _loads(data):
+        # Accepts the raw UTF-8 request body
+        return json.loads(data)
+
+
 # ---------------------------------------------------------------------------
 # Shared debug log
 # ---------------------------------------------------------------------------
+from standards_chat._log_queue import queue_log  # noqa: E402  (needs _lib_path)
+
+
 def _dlog(message):
-    try:
-        import io
-        from datetime import datetime
-        log_dir = os.path.join(os.environ.get('APPDATA', ''), 'BBB', 'StandardsAssistant')
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        log_path = os.path.join(log_dir, 'debug_log.txt')
-        with io.open(log_path, 'a', encoding='utf-8') as f:
-            f.write(u"{} [daemon] {}\n".format(datetime.now().isoformat(), message))
-    except Exception:
-        pass
+    """Queue a line for the shared debug log (written by a background thread)."""
+    queue_log('daemon', message)
 
 
 # ---------------------------------------------------------------------------
@@ -69,6 +101,17 @@ STATE_DIR = os.path.join(
     'BBB', 'Kodama'
 )
 STATE_FILE = os.path.join(STATE_DIR, 'daemon_state.json')
+_USERNAME = os.environ.get('USERNAME', '')
+
+
+def preferred_port():
+    """
+    Per-user localhost port the daemon tries first, so it keeps the same
+    port across restarts.  Ports can collide between users on a shared
+    machine, so clients identify the daemon by the PID and user /ping returns.
+    """
+    user = _USERNAME.encode('utf-8')
+    return 50000 + (zlib.adler32(user) & 0xffffffff) % 10000
 
 
 def write_state(pid, port):
@@ -118,6 +161,7 @@ from typing import Any
 
 try:
     from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
 except ImportError as _e:
     raise RuntimeError("search_daemon.py requires Python 3 (http.server not found): {}".format(_e))
 
@@ -125,17 +169,74 @@ except ImportError as _e:
 class _SearchHandler(BaseHTTPRequestHandler):
     """Request handler â€“ shares VectorDBClient via server.db_client."""
 
+    # Persistent connections: a client can send every query over one socket.
+    # Every response carries Content-Length (see _send_json) for framing.
+    protocol_version = 'HTTP/1.1'
+
+    # Headers and body go out in separate writes; with Nagle on, a kept-alive
+    # loopback connection can stall each response on the peer's delayed ACK
+    disable_nagle_algorithm = True
+
     # Silence the default request log to stdout (we use our own debug log)
     def log_message(self, fmt, *args):
         pass
 
+    # Status line + fixed headers for every code the daemon sends, built once
+    # so a response is one buffer and one write instead of the
+    # send_response/send_header/end_headers sequence
+    _HEADERS = dict(
+        (code, 'HTTP/1.1 {} {}\r\nContent-Type: application/json; charset=utf-8\r\n'
+               'Content-Length: '.format(code, phrase).encode('ascii'))
+        for code, phrase in ((200, 'OK'), (400, 'Bad Request'),
+                             (404, 'Not Found'), (500, 'Internal Server Error'))
+    )
+
     def _send_json(self, code, data):
-        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
-        self.send_response(code)
-        self.send_header('Content-Type', 'application/json; charset=utf-8')
-        self.send_header('Content-Length', str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
+        self._send_body(code, _dumps(data))
+
+    def _send_body(self, code, body):
+        """Send an already-encoded JSON body."""
+        # Honour a client's "Connection: close" (parse_request sets the flag)
+        connection = b'close' if self.close_connection else b'keep-alive'
+        self.wfile.write(
+            self._HEADERS[code] + str(len(body)).encode('ascii') +
+            b'\r\nConnection: ' + connection + b'\r\n\r\n' + body
+        )
+
+    # Result lists longer than this are streamed (chunked) instead of being
+    # encoded into one buffer first
+    STREAM_THRESHOLD = 32
+
+    _HEADERS_CHUNKED = (
+        b'HTTP/1.1 200 OK\r\nContent-Type: application/json; charset=utf-8\r\n'
+        b'Transfer-Encoding: chunked\r\nConnection: '
+    )
+
+    def _send_results(self, results):
+        """
+        Send {"success": true, "results": [...]} for a search.
+        Returns the encoded body, or None when the results were streamed.
+        """
+        if len(results) <= self.STREAM_THRESHOLD:
+            body = _dumps({'success': True, 'results': results})
+            self._send_body(200, body)
+            return body
+
+        connection = b'close' if self.close_connection else b'keep-alive'
+        self.wfile.write(self._HEADERS_CHUNKED + connection + b'\r\n\r\n')
+        try:
+            # One chunk per result, so only one encoded result is held at a time
+            prefix = b'{"success":true,"results":['
+            for result in results:
+                data = prefix + _dumps(result)
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                prefix = b','
+            self.wfile.write(b'2\r\n]}\r\n0\r\n\r\n')
+        except Exception as e:
+            # Headers are gone, so no error response is possible; drop the
+            # connection and let the client see the truncated body
+            _dlog("daemon: streaming results failed: {}".format(e))
+            self.close_connection = True
 
     def _read_body(self):
         length = int(self.headers.get('Content-Length', 0))
@@ -147,7 +248,9 @@ class _SearchHandler(BaseHTTPRequestHandler):
         server: Any = self.server
         if self.path == '/ping':
             server._reset_idle_timer()
-            self._send_json(200, {'ok': True})
+            # Clients check these against the state file / the process they
+            # spawned, since another user's daemon may hold the same port
+            self._send_json(200, {'ok': True, 'pid': os.getpid(), 'user': _USERNAME})
         else:
             self._send_json(404, {'error': 'not found'})
 
@@ -156,11 +259,10 @@ class _SearchHandler(BaseHTTPRequestHandler):
             self._handle_search()
         elif self.path == '/shutdown':
             self._send_json(200, {'ok': True})
-            # Shut down in a background thread so the response is sent first
+            # The response is already written; each connection has its own
+            # thread, so this can block until serve_forever() stops
             server: Any = self.server
-            t = threading.Thread(target=server.shutdown_gracefully)
-            t.daemon = True
-            t.start()
+            server.shutdown_gracefully()
         else:
             self._send_json(404, {'error': 'not found'})
 
@@ -169,59 +271,176 @@ class _SearchHandler(BaseHTTPRequestHandler):
         server._reset_idle_timer()
         try:
             raw = self._read_body()
-            req = json.loads(raw.decode('utf-8'))
+            req = _loads(raw)
             query = req.get('query', '')
             n_results = int(req.get('n_results', 10))
             deduplicate = bool(req.get('deduplicate', True))
 
+            queries = req.get('queries')
+            if queries is not None:
+                self._handle_search_batch(queries, n_results, deduplicate)
+                return
+
             if not query:
                 self._send_json(400, {'success': False, 'error': 'query is required'})
                 return
 
+            query = _normalize_query(query)
+            if len(query) < MIN_QUERY_LENGTH:
+                # Too short to match anything useful; skip embedding + search
+                self._send_json(200, {'success': True, 'results': []})
+                return
+
+            cache_key = (query, n_results, deduplicate)
+            cached = server.get_cached_entry(cache_key)
+            if cached is not None:
+                _dlog("daemon: search cache hit query='{}'".format(query[:80]))
+                results, body = cached
+                if body is not None:
+                    # Response encoded on the first request; no JSON walk
+                    self._send_body(200, body)
+                else:
+                    self._send_results(results)
+                return
+
             t0 = time.time()
             _dlog("daemon: search start query='{}'".format(query[:80]))
 
             db = server.db_client
-            results = db.hybrid_search(query=query, n_results=n_results, deduplicate=deduplicate)
+            # VectorDBClient keeps unsynchronised caches, so searches run one
+            # at a time; /ping and /shutdown are not blocked by them
+            with server.search_lock:
+                results = db.hybrid_search(query=query, n_results=n_results, deduplicate=deduplicate)
 
             elapsed = time.time() - t0
             _dlog("daemon: search done elapsed={:.2f}s results={}".format(elapsed, len(results)))
 
-            self._send_json(200, {'success': True, 'results': results})
+            body = self._send_results(results)
+            server.cache_results(cache_key, results, body)
 
         except Exception as e:
             tb = traceback.format_exc()
             _dlog("daemon: search exception: {}\n{}".format(e, tb))
             self._send_json(500, {'success': False, 'error': str(e), 'traceback': tb})
 
+    def _handle_search_batch(self, queries, n_results, deduplicate):
+        """Answer several queries in one request (one embeddings call for all)."""
+        server: Any = self.server
+        if not isinstance(queries, list) or not queries or \
+                not all(q and isinstance(q, str) for q in queries):
+            self._send_json(400, {'success': False,
+                                  'error': 'queries must be a list of non-empty strings'})
+            return
+
+        queries = [_normalize_query(q) for q in queries]
+        keys = [(q, n_results, deduplicate) for q in queries]
+        results_per_query = [
+            [] if len(q) < MIN_QUERY_LENGTH else server.get_cached_results(k)
+            for q, k in zip(queries, keys)]
+        missing = [i for i, r in enumerate(results_per_query) if r is None]
+
+        if missing:
+            t0 = time.time()
+            _dlog("daemon: batch search start queries={} uncached={}".format(
+                len(queries), len(missing)))
+            with server.search_lock:
+                fresh = server.db_client.hybrid_search_batch(
+                    [queries[i] for i in missing],
+                    n_results=n_results, deduplicate=deduplicate)
+            for i, results in zip(missing, fresh):
+                results_per_query[i] = results
+                server.cache_results(keys[i], results)
+            _dlog("daemon: batch search done elapsed={:.2f}s".format(time.time() - t0))
+
+        self._send_json(200, {'success': True, 'results_per_query': results_per_query})
+
 
 # ---------------------------------------------------------------------------
 # Server
 # ---------------------------------------------------------------------------
 IDLE_TIMEOUT_SECONDS = 1800  # 30 minutes
+RESULT_CACHE_SIZE = 256       # most recent (query, n_results, deduplicate) keys
+IDLE_CHECK_SECONDS = 60       # how often the watchdog checks for idleness
+MIN_QUERY_LENGTH = 3          # shorter (normalised) queries return no results
+
 
+def _normalize_query(query):
+    """Trim and collapse whitespace so trivially different queries share a cache key."""
+    return ' '.join(query.split())
+
+
+class _SearchServer(ThreadingMixIn, HTTPServer):
+    # One thread per connection, so a kept-alive connection doesn't block
+    # others; don't let open connections hold up process exit
+    daemon_threads = True
+
+    # SO_REUSEADDR lets a restarted daemon rebind its fixed port straight
+    # away on POSIX; on Windows it would let a second daemon bind the same
+    # port, so the bind must fail there and fall back to a random port
+    allow_reuse_address = os.name != 'nt'
 
-class _SearchServer(HTTPServer):
     def __init__(self, server_address, db_client):
         HTTPServer.__init__(self, server_address, _SearchHandler)
         self.db_client = db_client
-        self._idle_timer = None
-        self._reset_idle_timer()
+        self.search_lock = threading.Lock()
+        # LRU of recent search results; entries expire after the client's
+        # own query-cache TTL so a database sync is picked up
+        self._result_cache = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+        self._result_cache_ttl = getattr(db_client, 'cache_ttl', 300)
+        # One long-lived watchdog thread instead of a Timer per request;
+        # requests only refresh the activity timestamp
+        self._last_activity = time.monotonic()
+        self._stop_event = threading.Event()
+        self._watchdog = threading.Thread(target=self._idle_watchdog)
+        self._watchdog.daemon = True
+        self._watchdog.start()
 
     def _reset_idle_timer(self):
-        if self._idle_timer is not None:
-            self._idle_timer.cancel()
-        self._idle_timer = threading.Timer(IDLE_TIMEOUT_SECONDS, self.shutdown_gracefully)
-        self._idle_timer.daemon = True
-        self._idle_timer.start()
+        self._last_activity = time.monotonic()
+
+    def _idle_watchdog(self):
+        while not self._stop_event.wait(IDLE_CHECK_SECONDS):
+            if time.monotonic() - self._last_activity >= IDLE_TIMEOUT_SECONDS:
+                self.shutdown_gracefully()
+                return
+
+    def get_cached_entry(self, key):
+        """
+        Return (results, encoded_body) cached for *key*, or None if absent or
+        expired.  encoded_body is None for results that were streamed.
+        """
+        with self._result_cache_lock:
+            entry = self._result_cache.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= self._result_cache_ttl:
+                del self._result_cache[key]
+                return None
+            self._result_cache.move_to_end(key)
+            return entry[1], entry[2]
+
+    def get_cached_results(self, key):
+        """Return cached results for *key*, or None if absent or expired."""
+        entry = self.get_cached_entry(key)
+        return entry[0] if entry is not None else None
+
+    def cache_results(self, key, results, body=None):
+        with self._result_cache_lock:
+            self._result_cache[key] = (time.time(), results, body)
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
 
     def shutdown_gracefully(self):
         _dlog("daemon: shutting down (idle timeout or explicit request)")
+        self._stop_event.set()
+        with self._result_cache_lock:
+            self._result_cache.clear()
         clear_state()
-        # HTTPServer.shutdown() must be called from a different thread
-        t = threading.Thread(target=self.shutdown)
-        t.daemon = True
-        t.start()
+        # HTTPServer.shutdown() must not run on the serve_forever() thread;
+        # callers are request threads or the idle watchdog, never that one
+        self.shutdown()
 
 
 # ---------------------------------------------------------------------------
@@ -249,8 +468,23 @@ def main():
     init_elapsed = time.time() - t0_init
     _dlog("daemon: VectorDBClient ready in {:.2f}s".format(init_elapsed))
 
-    # Bind to a random available localhost port
-    server = _SearchServer(('127.0.0.1', 0), db_client)
+    # Warm up: load the vector index and embedding cache now, before
+    # DAEMON_READY, so the first real query doesn't pay for it.  (A dummy
+    # search would also cost an embeddings API call and pollute the caches.)
+    t0_warm = time.time()
+    try:
+        db_client._load_index()
+        db_client._load_embedding_cache()
+    except Exception as e:
+        _dlog("daemon: warmup failed (non-fatal): {}".format(e))
+    _dlog("daemon: warmup done in {:.2f}s".format(time.time() - t0_warm))
+
+    # Bind to the per-user port, or any free localhost port if it is taken
+    try:
+        server = _SearchServer(('127.0.0.1', preferred_port()), db_client)
+    except OSError as e:
+        _dlog("daemon: preferred port unavailable ({}), using a random port".format(e))
+        server = _SearchServer(('127.0.0.1', 0), db_client)
     port = server.server_address[1]
 
     write_state(os.getpid(), port)
@@ -261,6 +495,10 @@ def main():
     sys.stdout.write("DAEMON_READY port={}\n".format(port))
     sys.stdout.flush()
 
+    # Nobody reads the pipe after the ready line; stray print()s (e.g. from
+    # VectorDBClient.get_embeddings_batch) must not fill it and block us
+    sys.stdout = open(os.devnull, 'w')
+
     try:
         server.serve_forever()
     except KeyboardInterrupt:
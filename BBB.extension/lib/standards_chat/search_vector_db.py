@@ -29,21 +29,12 @@ if os.path.isdir(_packages_dir) and _packages_dir not in sys.path:
 
 from standards_chat.config_manager import ConfigManager
 from standards_chat.vector_db_client import VectorDBClient
+from standards_chat._log_queue import queue_log
 
 
 def _debug_log(message):
-    """Write directly to the same debug log used by the interop client."""
-    try:
-        import io
-        from datetime import datetime
-        log_dir = os.path.join(os.environ.get('APPDATA', ''), 'BBB', 'StandardsAssistant')
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        log_path = os.path.join(log_dir, 'debug_log.txt')
-        with io.open(log_path, 'a', encoding='utf-8') as f:
-            f.write(u"{} [search_script] {}\n".format(datetime.now().isoformat(), message))
-    except Exception:
-        pass
+    """Queue a line for the debug log shared with the interop client."""
+    queue_log('search_script', message)
 
 
 def _write_result(result_dict, output_file=None):
@@ -73,7 +64,15 @@ def main():
         query = None
         i = 0
         while i < len(args):
-            if args[i] == '--base64' and i + 1 < len(args):
+            if args[i] == '--stdin':
+                # Raw UTF-8 query piped in by the interop client
+                query = sys.stdin.buffer.read().decode('utf-8')
+                i += 1
+            elif args[i] == '--input' and i + 1 < len(args):
+                with open(args[i + 1], 'rb') as f:
+                    query = f.read().decode('utf-8')
+                i += 2
+            elif args[i] == '--base64' and i + 1 < len(args):
                 query = base64.b64decode(args[i + 1]).decode('utf-8')
                 i += 2
             elif args[i] == '--output' and i + 1 < len(args):
@@ -7,10 +7,7 @@ import os
 import sys
 import time as _time
 
-import clr
-clr.AddReference('PresentationFramework')
-clr.AddReference('PresentationCore')
-clr.AddReference('WindowsBase')
+from standards_chat._wpf_init import frozen_brush  # also adds the WPF assembly references
 
 try:
     from typing import Any  # CPython 3.5+
@@ -18,7 +15,6 @@ except ImportError:
     Any = object  # type: ignore  # IronPython 2.7 fallback
 
 from System.Windows import SystemParameters
-from System.Windows.Media import SolidColorBrush, Color
 from System.Windows.Threading import DispatcherTimer
 from System import TimeSpan
 
@@ -42,10 +38,10 @@ class SetupProgressWindow(forms.WPFWindow):
     """
 
     # Colours reused when showing final states
-    _BLUE   = SolidColorBrush(Color.FromRgb(0,   120, 212))   # #0078D4
-    _GREEN  = SolidColorBrush(Color.FromRgb(16,  124,  16))   # #107C10
-    _RED    = SolidColorBrush(Color.FromRgb(168,   0,   0))   # #A80000
-    _GREY   = SolidColorBrush(Color.FromRgb(96,   94,  92))   # #605E5C
+    _BLUE   = frozen_brush(0,   120, 212)   # #0078D4
+    _GREEN  = frozen_brush(16,  124,  16)   # #107C10
+    _RED    = frozen_brush(168,   0,   0)   # #A80000
+    _GREY   = frozen_brush(96,   94,  92)   # #605E5C
 
     def __init__(self, status_dict):
         """
@@ -1435,7 +1435,7 @@ class SharePointClient:
             self.config.set_config('vector_search.failed_pdf_count', pdf_failed_count)
             self.config.set_config('vector_search.indexed_video_count', video_success_count)
             self.config.set_config('vector_search.failed_video_count', video_failed_count)
-            self.config.save()
+            self.config.flush()
             
             return {
                 'success': True,
@@ -608,3 +608,34 @@ def sanitize_filename(filename):
     for char in invalid_chars:
         filename = filename.replace(char, '_')
     return filename
+
+
+# XAML text keyed by path; WPF objects can't be reused between windows, but
+# the file read and encoding detection only need to happen once per session
+_XAML_CACHE = {}
+
+
+def load_wpf_window(window, xaml_path):
+    """
+    Initialize a pyRevit WPFWindow from ``xaml_path`` using cached XAML text.
+    Falls back to loading straight from the file if the cached text fails.
+    """
+    from pyrevit import forms
+
+    xaml_text = _XAML_CACHE.get(xaml_path)
+    if xaml_text is None:
+        try:
+            with io.open(xaml_path, 'r', encoding='utf-8-sig') as f:
+                xaml_text = f.read()
+            _XAML_CACHE[xaml_path] = xaml_text
+        except Exception:
+            xaml_text = None
+
+    if xaml_text:
+        try:
+            forms.WPFWindow.__init__(window, xaml_text, literal_string=True)
+            return
+        except Exception:
+            _XAML_CACHE.pop(xaml_path, None)
+
+    forms.WPFWindow.__init__(window, xaml_path)
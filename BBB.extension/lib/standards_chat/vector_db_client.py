@@ -361,7 +361,7 @@ class VectorDBClient:
             self.config.set_config('vector_search.last_sync_timestamp', datetime.now().isoformat())
             self.config.set_config('vector_search.indexed_document_count', len(documents))
             self.config.set_config('vector_search.indexed_chunk_count', len(all_texts))
-            self.config.save()
+            self.config.flush()
         except Exception:
             pass
 
@@ -693,6 +693,29 @@ class VectorDBClient:
         self._cache_results(cache_key, final_results)
         return final_results
 
+    def hybrid_search_batch(self, queries, n_results=None, deduplicate=True):
+        """
+        Run hybrid_search for several queries.
+        Embeddings for all uncached queries are fetched in one OpenAI request
+        up front, so each search below hits the embedding cache.
+
+        Args:
+            queries: List of search query texts
+            n_results: Number of results to return per query
+            deduplicate: Whether to deduplicate by URL
+
+        Returns:
+            List of result lists, same order as queries
+        """
+        if self._load_index() is not None:
+            try:
+                self.get_embeddings_batch(list(queries))
+            except Exception as e:
+                # Each search will retry its own embedding
+                self._tlog("hybrid_search_batch: batch embedding failed: {}".format(e))
+
+        return [self.hybrid_search(q, n_results, deduplicate) for q in queries]
+
     def get_stats(self):
         """
         Get statistics about the indexed collection.
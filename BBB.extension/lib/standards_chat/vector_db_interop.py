@@ -4,16 +4,17 @@ Vector DB Interop Client
 Allows IronPython (Revit) to communicate with CPython Vector DB Client.
 
 Uses pyRevit's bundled CPython — no pip install required.
-IronPython calls pyRevit CPython as a one-shot subprocess to do numpy
-cosine similarity math and return JSON results.
+IronPython sends searches to a long-lived pyRevit CPython daemon
+(search_daemon.py) over localhost HTTP, falling back to a one-shot
+subprocess (search_vector_db.py) if the daemon cannot be started.
 """
 import sys
 import os
 import json
 import subprocess
-import base64
 import tempfile
 import time
+import weakref
 import threading as _threading
 
 from standards_chat.utils import safe_print, safe_str
@@ -147,6 +148,52 @@ _db_sync_status = {
     'start_time': None,
 }
 
+# Weak references to windows watching the sync (see register_status_listener)
+_db_sync_listeners = []
+_db_sync_listeners_lock = _threading.Lock()
+
+
+def register_status_listener(listener):
+    """
+    Subscribe a window to ``_db_sync_status`` changes.
+
+    ``listener.post_status(status)`` is called from the sync thread with a
+    snapshot of the status dict whenever the phase or message changes; the
+    listener is responsible for marshalling onto its own dispatcher.  Only a
+    weak reference is kept so a closed window is never held alive.
+    """
+    with _db_sync_listeners_lock:
+        _db_sync_listeners.append(weakref.ref(listener))
+
+
+def unregister_status_listener(listener):
+    """Remove a listener added with ``register_status_listener``."""
+    with _db_sync_listeners_lock:
+        _db_sync_listeners[:] = [
+            ref for ref in _db_sync_listeners
+            if ref() is not None and ref() is not listener
+        ]
+
+
+def _notify(phase, message=None):
+    """Update ``_db_sync_status`` and push a snapshot to every live listener."""
+    _db_sync_status['phase'] = phase
+    if message is not None:
+        _db_sync_status['message'] = message
+    snapshot = dict(_db_sync_status)
+
+    with _db_sync_listeners_lock:
+        _db_sync_listeners[:] = [ref for ref in _db_sync_listeners if ref() is not None]
+        listeners = [ref() for ref in _db_sync_listeners]
+
+    for listener in listeners:
+        if listener is None:
+            continue
+        try:
+            listener.post_status(snapshot)
+        except Exception as exc:
+            debug_log('DB sync listener error: {}'.format(exc))
+
 
 def check_numpy_installed():
     """
@@ -347,7 +394,8 @@ def start_db_sync_async(config_manager):
     """
     Start a background thread that copies vectors.npz + metadata.json
     from the network path to the local cache directory.
-    Progress is written to the module-level ``_db_sync_status`` dict.
+    Progress is written to the module-level ``_db_sync_status`` dict and
+    pushed to any listeners registered with ``register_status_listener``.
     """
     import shutil as _shutil
 
@@ -358,15 +406,14 @@ def start_db_sync_async(config_manager):
         network_db_path = os.path.join(config_dir, db_path_rel)
         local_db_path   = os.path.join(_STATE_DIR, 'vector_db')
     except Exception as exc:
-        _db_sync_status['phase'] = 'error'
         _db_sync_status['error'] = u'Could not resolve DB paths: {}'.format(exc)
+        _notify('error')
         return
 
     def _worker():
-        _db_sync_status['phase']      = 'syncing'
-        _db_sync_status['message']    = u'Copying updated standards database\u2026'
         _db_sync_status['error']      = None
         _db_sync_status['start_time'] = time.time()
+        _notify('syncing', u'Copying updated standards database\u2026')
         try:
             if not os.path.exists(local_db_path):
                 os.makedirs(local_db_path)
@@ -379,12 +426,11 @@ def start_db_sync_async(config_manager):
 
             elapsed = time.time() - _db_sync_status['start_time']
             debug_log('DB sync complete in {:.1f}s'.format(elapsed))
-            _db_sync_status['phase']   = 'done'
-            _db_sync_status['message'] = u'Standards database updated successfully.'
+            _notify('done', u'Standards database updated successfully.')
         except Exception as exc:
             debug_log('DB sync error: {}'.format(exc))
-            _db_sync_status['phase'] = 'error'
             _db_sync_status['error'] = u'{}'.format(exc)
+            _notify('error')
 
     t = _threading.Thread(target=_worker, name='kodama-db-sync')
     t.daemon = True
@@ -411,13 +457,174 @@ def reset_local_env(rebuild=False):
     return True, u'Nothing to reset \u2014 no local environment is managed.'
 
 
+# ---------------------------------------------------------------------------
+# Search daemon (search_daemon.py) – keeps VectorDBClient warm across queries
+# ---------------------------------------------------------------------------
+# Must match search_daemon.STATE_FILE (that module is Python 3 only, so it
+# cannot be imported here)
+_DAEMON_STATE_FILE = os.path.join(_STATE_DIR, 'daemon_state.json')
+
+
+_DAEMON_PING_TIMEOUT = 2       # seconds
+_DAEMON_SEARCH_TIMEOUT = 120   # seconds
+# A cold start (imports plus index and embedding-cache load) takes about a
+# minute on a typical workstation; allow for slow disks and network paths
+_DAEMON_START_TIMEOUT = 180    # seconds to wait for DAEMON_READY
+# After a failed start, searches use the CLI for this long before another
+# daemon is spawned, so a broken daemon is not re-launched on every query
+_DAEMON_RETRY_SECONDS = 600
+
+# Port and PID of the daemon this session talks to; None until one has been
+# found or started.  Shared by every client instance in the Revit session.
+_daemon_port = None
+_daemon_pid = None
+_daemon_lock = _threading.Lock()
+# time.time() of the last failed start, or None
+_daemon_failed_at = None
+
+# .NET HttpClients, created on first use; they pool and reuse connections
+_daemon_http = {}
+
+
+def _daemon_client(kind):
+    """Return the shared HttpClient for 'ping' or 'search' requests."""
+    client = _daemon_http.get(kind)
+    if client is None:
+        import clr
+        clr.AddReference('System.Net.Http')
+        from System import TimeSpan
+        from System.Net.Http import HttpClient
+        client = HttpClient()
+        client.Timeout = TimeSpan.FromSeconds(
+            _DAEMON_PING_TIMEOUT if kind == 'ping' else _DAEMON_SEARCH_TIMEOUT)
+        _daemon_http[kind] = client
+    return client
+
+
+def _daemon_ping(port, pid):
+    """
+    Return True if *our* daemon answers /ping on *port*.
+
+    Ports are derived from the user name and can collide on a shared
+    terminal server, so the reply must carry the expected PID and user.
+    """
+    if port is None or pid is None:
+        return False
+    try:
+        response = _daemon_client('ping').GetAsync(
+            'http://127.0.0.1:{}/ping'.format(port)).Result
+        if not response.IsSuccessStatusCode:
+            return False
+        data = json.loads(response.Content.ReadAsStringAsync().Result)
+        return data.get('pid') == pid and \
+            data.get('user') == os.environ.get('USERNAME', '')
+    except Exception:
+        return False
+
+
+def _read_daemon_state():
+    """Return (pid, port) from the daemon state file, or (None, None)."""
+    try:
+        with open(_DAEMON_STATE_FILE, 'r') as f:
+            data = json.load(f)
+        return data.get('pid'), data.get('port')
+    except Exception:
+        return None, None
+
+
+def _start_daemon(python_exe, script_path):
+    """Start search_daemon.py and return (pid, port), or (None, None) if it failed."""
+    debug_log("search daemon: starting {}".format(script_path))
+    t0 = time.time()
+    devnull = open(os.devnull, 'w')
+    try:
+        process = subprocess.Popen(
+            [python_exe, script_path],
+            stdout=subprocess.PIPE,
+            stderr=devnull,
+            shell=False,
+            creationflags=0x08000000  # CREATE_NO_WINDOW
+        )
+    finally:
+        devnull.close()
+
+    # The daemon prints "DAEMON_READY port=N" once VectorDBClient is loaded,
+    # or exits (closing stdout) if start-up fails.  readline() can block for
+    # as long as start-up hangs, so it runs on a helper thread and the wait
+    # is bounded -- callers hold _daemon_lock and must reach the CLI path
+    ready = []
+
+    def _read_ready():
+        while True:
+            line = process.stdout.readline()
+            if not line:
+                return
+            if isinstance(line, bytes):
+                line = line.decode('utf-8', 'replace')
+            if line.startswith('DAEMON_READY port='):
+                ready.append(int(line.strip().split('=', 1)[1]))
+                return
+
+    reader = _threading.Thread(target=_read_ready)
+    reader.daemon = True
+    reader.start()
+    reader.join(_DAEMON_START_TIMEOUT)
+
+    if not ready:
+        if reader.is_alive():
+            debug_log("search daemon: no DAEMON_READY after {}s, killing it".format(
+                _DAEMON_START_TIMEOUT))
+        else:
+            debug_log("search daemon: exited during start-up (rc={})".format(
+                process.poll()))
+        # Never leave a half-started daemon behind
+        try:
+            process.kill()
+        except Exception:
+            pass
+        return None, None
+
+    port = ready[0]
+    debug_log("TIMING search daemon start={:.2f}s port={}".format(
+        time.time() - t0, port))
+    return process.pid, port
+
+
+def _ensure_daemon(python_exe, script_path):
+    """Return the port of a running search daemon, starting one if needed."""
+    global _daemon_port, _daemon_pid, _daemon_failed_at
+    with _daemon_lock:
+        if _daemon_ping(_daemon_port, _daemon_pid):
+            return _daemon_port
+
+        # A daemon from an earlier code reload may still be running; the
+        # per-user state file records which process owns which port
+        pid, port = _read_daemon_state()
+        if not _daemon_ping(port, pid):
+            if _daemon_failed_at is not None and \
+                    time.time() - _daemon_failed_at < _DAEMON_RETRY_SECONDS:
+                return None
+            pid, port = _start_daemon(python_exe, script_path)
+            _daemon_failed_at = time.time() if port is None else None
+        _daemon_port, _daemon_pid = port, pid
+        return port
+
+
+def _forget_daemon():
+    """Drop the cached port so the next search looks for a daemon again."""
+    global _daemon_port, _daemon_pid
+    _daemon_port = None
+    _daemon_pid = None
+
+
 # ---------------------------------------------------------------------------
 # Main interop client
 # ---------------------------------------------------------------------------
 class VectorDBInteropClient:
     """
     Shim client: called from IronPython (Revit), delegates search to
-    pyRevit's bundled CPython via a one-shot subprocess.
+    pyRevit's bundled CPython -- the warm search daemon when it can be
+    reached, a one-shot subprocess otherwise.
     """
 
     def __init__(self, config_manager):
@@ -425,6 +632,7 @@ class VectorDBInteropClient:
 
         current_dir = os.path.dirname(os.path.abspath(__file__))
         self.script_path = os.path.join(current_dir, 'search_vector_db.py')
+        self.daemon_script_path = os.path.join(current_dir, 'search_daemon.py')
 
         if _PYREVIT_PYTHON is None:
             raise RuntimeError(
@@ -451,39 +659,78 @@ class VectorDBInteropClient:
             return True
 
     def hybrid_search(self, query, n_results=10, deduplicate=True):
-        """Execute hybrid search via CPython subprocess."""
+        """Execute hybrid search via the search daemon or a CPython subprocess."""
         debug_log("VectorDBInteropClient: hybrid_search for query: {}".format(
             safe_str(query)[:100]))
-        return self._hybrid_search_cli(query, n_results, deduplicate)
+        results = self._hybrid_search_daemon(query, n_results, deduplicate)
+        if results is None:
+            results = self._hybrid_search_cli(query, n_results, deduplicate)
+        return results
+
+    def _hybrid_search_daemon(self, query, n_results=10, deduplicate=True):
+        """
+        Search through the warm daemon (started on first use).
+        Returns None when the daemon is unavailable so the caller can fall
+        back to the one-shot subprocess.
+        """
+        try:
+            port = _ensure_daemon(self.python_exe, self.daemon_script_path)
+            if port is None:
+                return None
+
+            from System.Net.Http import ByteArrayContent
+            from System.Text import Encoding
+            body = json.dumps({
+                'query': query,
+                'n_results': n_results,
+                'deduplicate': deduplicate,
+            })
+            content = ByteArrayContent(Encoding.UTF8.GetBytes(body))
+
+            t0 = time.time()
+            response = _daemon_client('search').PostAsync(
+                'http://127.0.0.1:{}/search'.format(port), content).Result
+            result = json.loads(response.Content.ReadAsStringAsync().Result)
+            debug_log("TIMING daemon search={:.2f}s status={}".format(
+                time.time() - t0, int(response.StatusCode)))
+
+            if result.get('success'):
+                return result.get('results', [])
+            debug_log("hybrid_search: daemon error: {}".format(
+                safe_str(result.get('error', ''))[:300]))
+            return []
+
+        except Exception as e:
+            debug_log("hybrid_search daemon error: {}".format(e))
+            _forget_daemon()
+            return None
 
     def _hybrid_search_cli(self, query, n_results=10, deduplicate=True):
         """One-shot subprocess search."""
         try:
+            # The query goes over stdin as raw UTF-8: no base64 step and no
+            # command-line length or quoting limits
             query_bytes = query.encode('utf-8')
-            raw_b64 = base64.b64encode(query_bytes)
-            if isinstance(raw_b64, bytes):
-                query_b64 = raw_b64.decode('ascii')
-            else:
-                query_b64 = str(raw_b64)
 
             tmp_fd, tmp_path = tempfile.mkstemp(suffix='.json', prefix='kodama_search_')
             os.close(tmp_fd)
 
             cmd = [self.python_exe, self.script_path,
-                   '--base64', query_b64, '--output', tmp_path]
-            debug_log("VectorDBInteropClient: running subprocess (query_b64_len={})".format(
-                len(query_b64)))
+                   '--stdin', '--output', tmp_path]
+            debug_log("VectorDBInteropClient: running subprocess (query_len={})".format(
+                len(query_bytes)))
 
             CREATE_NO_WINDOW = 0x08000000
             t0 = time.time()
             process = subprocess.Popen(
                 cmd,
+                stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 shell=False,
                 creationflags=CREATE_NO_WINDOW
             )
-            stdout, stderr = process.communicate()
+            stdout, stderr = process.communicate(query_bytes)
             debug_log("TIMING subprocess total={:.2f}s returncode={}".format(
                 time.time() - t0, process.returncode))
 